@@ -0,0 +1,214 @@
+"""
+Accessible Route Optimizer - Compiled Kernels
+Numba-compiled kernels for bulk accessibility filtering, with NumPy fallbacks
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is optional; every kernel below has a NumPy equivalent
+    njit = None
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def mask_match(masks, req):
+        """Return True where every bit of req is set in masks[i]"""
+        out = np.empty(masks.shape[0], dtype=np.bool_)
+        for i in prange(masks.shape[0]):
+            out[i] = (masks[i] & req) == req
+        return out
+else:
+    def mask_match(masks, req):
+        """Return True where every bit of req is set in masks[i]"""
+        return (masks & req) == req
+
+
+def edge_ok(u_mask, v_mask, e_mask, req, edge_req):
+    """Return True when both stops provide req and the edge provides edge_req"""
+    return (u_mask & req) == req and (v_mask & req) == req and (e_mask & edge_req) == edge_req
+
+
+if njit is not None:
+    # Inlined into any JIT-compiled caller, e.g. a compiled path search
+    edge_ok = njit(cache=True, inline='always')(edge_ok)
+    
+    @njit(parallel=True, cache=True)
+    def edges_ok(u_masks, v_masks, e_masks, req, edge_req):
+        """Apply edge_ok to parallel arrays of stop and edge masks"""
+        out = np.empty(e_masks.shape[0], dtype=np.bool_)
+        for i in prange(e_masks.shape[0]):
+            out[i] = edge_ok(u_masks[i], v_masks[i], e_masks[i], req, edge_req)
+        return out
+else:
+    def edges_ok(u_masks, v_masks, e_masks, req, edge_req):
+        """Apply edge_ok to parallel arrays of stop and edge masks"""
+        return (((u_masks & req) == req) & ((v_masks & req) == req) &
+                ((e_masks & edge_req) == edge_req))
+
+
+def _find(parent, i):
+    """Return the root of i, halving the path on the way up"""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def count_components(indptr, indices):
+    """Count connected components of a CSR adjacency with union-find"""
+    n = indptr.shape[0] - 1
+    parent = np.arange(n, dtype=np.int32)
+    components = n
+    for u in range(n):
+        for k in range(indptr[u], indptr[u + 1]):
+            ru = _find(parent, u)
+            rv = _find(parent, indices[k])
+            if ru != rv:
+                parent[rv] = ru
+                components -= 1
+    return components
+
+
+if njit is not None:
+    _find = njit(cache=True, inline='always')(_find)
+    count_components = njit(cache=True)(count_components)
+
+
+def heap4_push(keys, values, size, key, value):
+    """
+    Push onto a 4-ary min-heap stored in preallocated key/value arrays
+    
+    Returns the new heap size. The children of slot i are 4i+1 .. 4i+4, so the
+    tree is half as deep as a binary heap and sift-downs touch fewer levels.
+    """
+    i = size
+    while i > 0:
+        parent = (i - 1) >> 2
+        if key >= keys[parent]:
+            break
+        keys[i] = keys[parent]
+        values[i] = values[parent]
+        i = parent
+    keys[i] = key
+    values[i] = value
+    return size + 1
+
+
+def heap4_pop(keys, values, size):
+    """Pop the smallest key of a 4-ary min-heap; returns (key, value, new size)"""
+    top_key = keys[0]
+    top_value = values[0]
+    size -= 1
+    key = keys[size]
+    value = values[size]
+    
+    # Sift the former last item down from the root, taking the min of up to four children
+    i = 0
+    while True:
+        child = 4 * i + 1
+        if child >= size:
+            break
+        best = child
+        for j in range(child + 1, min(child + 4, size)):
+            if keys[j] < keys[best]:
+                best = j
+        if keys[best] >= key:
+            break
+        keys[i] = keys[best]
+        values[i] = values[best]
+        i = best
+    keys[i] = key
+    values[i] = value
+    return top_key, top_value, size
+
+
+if njit is not None:
+    heap4_push = njit(cache=True, inline='always')(heap4_push)
+    heap4_pop = njit(cache=True, inline='always')(heap4_pop)
+
+
+def dijkstra_csr(indptr, indices, weights, src, dst):
+    """
+    Dijkstra's algorithm over CSR arrays with non-negative weights, stopping at dst
+    
+    Returns (dist, predecessors) arrays over all stops: dist is inf and the
+    predecessor -1 for stops not reached before dst was settled.
+    """
+    n = indptr.shape[0] - 1
+    dist = np.full(n, np.inf)
+    predecessors = np.full(n, -1, dtype=np.int32)
+    settled = np.zeros(n, dtype=np.bool_)
+    
+    # Stale entries stay in the heap, so it holds at most one entry per edge plus the source
+    keys = np.empty(indices.shape[0] + 1, dtype=np.float64)
+    values = np.empty(indices.shape[0] + 1, dtype=np.int64)
+    dist[src] = 0.0
+    size = heap4_push(keys, values, 0, 0.0, src)
+    while size > 0:
+        d, u, size = heap4_pop(keys, values, size)
+        if settled[u]:
+            continue
+        settled[u] = True
+        if u == dst:
+            break
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            candidate = d + weights[k]
+            if candidate < dist[v]:
+                dist[v] = candidate
+                predecessors[v] = u
+                size = heap4_push(keys, values, size, candidate, v)
+    return dist, predecessors
+
+
+if njit is not None:
+    # Releases the GIL, so searches on a thread pool run in parallel
+    dijkstra_csr = njit(cache=True, nogil=True)(dijkstra_csr)
+    
+    @njit(parallel=True, cache=True)
+    def all_pairs_dijkstra(indptr, indices, weights):
+        """Run dijkstra_csr to completion from every stop; returns (dist, predecessors) matrices"""
+        n = indptr.shape[0] - 1
+        dist = np.empty((n, n), dtype=np.float64)
+        predecessors = np.empty((n, n), dtype=np.int32)
+        for src in prange(n):
+            dist[src], predecessors[src] = dijkstra_csr(indptr, indices, weights, src, -1)
+        return dist, predecessors
+else:
+    def all_pairs_dijkstra(indptr, indices, weights):
+        """Run dijkstra_csr to completion from every stop; returns (dist, predecessors) matrices"""
+        n = indptr.shape[0] - 1
+        dist = np.empty((n, n), dtype=np.float64)
+        predecessors = np.empty((n, n), dtype=np.int32)
+        for src in range(n):
+            dist[src], predecessors[src] = dijkstra_csr(indptr, indices, weights, src, -1)
+        return dist, predecessors
+
+
+if njit is not None:
+    # No explicit signature: pandas hands out read-only views, which need their own
+    # specialization. No fastmath either, so minutes match the NumPy division exactly
+    @njit(cache=True)
+    def trip_travel_times(trip_codes, arrival_s, departure_s):
+        """Minutes from each stop time to the next of the same trip, -1 at trip ends"""
+        n = trip_codes.shape[0]
+        out = np.empty(n, dtype=np.float64)
+        for i in range(n - 1):
+            if trip_codes[i] >= 0 and trip_codes[i] == trip_codes[i + 1]:
+                out[i] = max(1.0, (arrival_s[i + 1] - departure_s[i]) / 60.0)
+            else:
+                out[i] = -1.0
+        if n > 0:
+            out[n - 1] = -1.0
+        return out
+else:
+    def trip_travel_times(trip_codes, arrival_s, departure_s):
+        """Minutes from each stop time to the next of the same trip, -1 at trip ends"""
+        out = np.full(trip_codes.shape[0], -1.0)
+        same_trip = (trip_codes[:-1] >= 0) & (trip_codes[:-1] == trip_codes[1:])
+        minutes = np.maximum(1.0, (arrival_s[1:] - departure_s[:-1]) / 60.0)
+        out[:-1] = np.where(same_trip, minutes, -1.0)
+        return out
@@ -3,9 +3,12 @@ Accessible Route Optimizer - Accessibility Filtering Logic
 Handles all accessibility-related filtering and validation
 """
 
-from typing import Dict, List, Set
+from functools import lru_cache
+from typing import Callable, Dict, List, Set, Tuple
 from enum import Enum
 
+import numpy as np
+
 
 class AccessibilityRequirement(Enum):
     """Enumeration of supported accessibility requirements"""
@@ -20,11 +23,132 @@ class AccessibilityRequirement(Enum):
     LEVEL_BOARDING = "level_boarding"
 
 
+# Bit assigned to each boolean stop feature in a packed feature mask.
+# 'no_stairs' and 'working_elevator' are derived from the raw fields.
+FEATURE_BITS = {
+    'wheelchair_accessible': 1 << 0,
+    'has_elevator': 1 << 1,
+    'has_stairs': 1 << 2,
+    'has_ramp': 1 << 3,
+    'elevator_working': 1 << 4,
+    'audio_announcements': 1 << 5,
+    'visual_displays': 1 << 6,
+    'tactile_guidance': 1 << 7,
+    'wide_doors': 1 << 8,
+    'level_boarding': 1 << 9,
+    'low_floor_service': 1 << 10,
+    'no_stairs': 1 << 11,
+    'working_elevator': 1 << 12
+}
+
+# Bit assigned to each boolean edge (route segment) feature
+EDGE_BITS = {
+    'wheelchair_accessible': 1 << 0,
+    'has_elevator': 1 << 1,
+    'has_stairs': 1 << 2,
+    'low_floor': 1 << 3,
+    'wide_doors': 1 << 4
+}
+
+# Stop bits and edge bits that must be set to satisfy each requirement
+REQUIREMENT_BITS = {
+    'wheelchair_accessible': (FEATURE_BITS['wheelchair_accessible'], EDGE_BITS['wheelchair_accessible']),
+    'no_stairs': (FEATURE_BITS['no_stairs'], 0),
+    'working_elevator': (FEATURE_BITS['working_elevator'], 0),
+    'low_floor_vehicle': (FEATURE_BITS['low_floor_service'], EDGE_BITS['low_floor']),
+    'audio_announcements': (FEATURE_BITS['audio_announcements'], 0),
+    'visual_displays': (FEATURE_BITS['visual_displays'], 0),
+    'tactile_guidance': (FEATURE_BITS['tactile_guidance'], 0),
+    'wide_doors': (FEATURE_BITS['wide_doors'], EDGE_BITS['wide_doors']),
+    'level_boarding': (FEATURE_BITS['level_boarding'], 0)
+}
+
+# Weighted accessibility features used for stop scores
+SCORE_WEIGHTS = {
+    'wheelchair_accessible': 0.25,
+    'has_elevator': 0.15,
+    'elevator_working': 0.10,
+    'has_ramp': 0.10,
+    'audio_announcements': 0.10,
+    'visual_displays': 0.10,
+    'tactile_guidance': 0.05,
+    'wide_doors': 0.05,
+    'level_boarding': 0.05,
+    'low_floor_service': 0.05
+}
+
+# Never set on any stop, so unknown requirements are never met
+UNKNOWN_REQUIREMENT_BIT = 1 << 31
+
+_DERIVED_FEATURES = ('no_stairs', 'working_elevator')
+
+
+def stop_feature_mask(stop_data: Dict) -> int:
+    """
+    Pack the boolean accessibility features of a stop into an integer mask
+    
+    Args:
+        stop_data: Accessibility metadata for a single stop
+    
+    Returns:
+        Integer with the FEATURE_BITS bit set for every feature the stop provides
+    """
+    mask = 0
+    for feature, bit in FEATURE_BITS.items():
+        if feature not in _DERIVED_FEATURES and stop_data.get(feature, False):
+            mask |= bit
+    
+    # Either no stairs at all, or alternative access available
+    if (not stop_data.get('has_stairs', True) or
+            stop_data.get('has_elevator', False) or stop_data.get('has_ramp', False)):
+        mask |= FEATURE_BITS['no_stairs']
+    if stop_data.get('has_elevator', False) and stop_data.get('elevator_working', True):
+        mask |= FEATURE_BITS['working_elevator']
+    
+    return mask
+
+
+def edge_feature_mask(edge_data: Dict) -> int:
+    """
+    Pack the boolean accessibility features of an edge into an integer mask
+    
+    Args:
+        edge_data: Edge attributes from the graph
+    
+    Returns:
+        Integer with the EDGE_BITS bit set for every feature the edge provides
+    """
+    mask = 0
+    for feature, bit in EDGE_BITS.items():
+        # Stairs are assumed present unless stated otherwise
+        if edge_data.get(feature, feature == 'has_stairs'):
+            mask |= bit
+    return mask
+
+
+@lru_cache(maxsize=128)
+def _compile_requirements(requirements: Tuple[str, ...]) -> Tuple[int, int]:
+    """Fold a tuple of requirement strings into (stop mask, edge mask)"""
+    stop_mask = 0
+    edge_mask = 0
+    for requirement in requirements:
+        if requirement in REQUIREMENT_BITS:
+            stop_bit, edge_bit = REQUIREMENT_BITS[requirement]
+            stop_mask |= stop_bit
+            edge_mask |= edge_bit
+        else:
+            stop_mask |= UNKNOWN_REQUIREMENT_BIT
+    return stop_mask, edge_mask
+
+
 class AccessibilityFilter:
     """
     Handles filtering of transit network based on accessibility requirements
     """
     
+    __slots__ = ('accessibility_data', '_stop_masks', '_stop_index', '_stop_masks_arr',
+                 '_F', '_W', '_scores_arr', '_predicates')
+    
     def __init__(self, accessibility_data: Dict):
         """
         Initialize the accessibility filter
@@ -33,17 +157,54 @@ class AccessibilityFilter:
             accessibility_data: Dictionary containing accessibility metadata for stops
         """
         self.accessibility_data = accessibility_data
-        self.requirement_checkers = {
-            'wheelchair_accessible': self._check_wheelchair_accessible,
-            'no_stairs': self._check_no_stairs,
-            'working_elevator': self._check_working_elevator,
-            'low_floor_vehicle': self._check_low_floor_vehicle,
-            'audio_announcements': self._check_audio_announcements,
-            'visual_displays': self._check_visual_displays,
-            'tactile_guidance': self._check_tactile_guidance,
-            'wide_doors': self._check_wide_doors,
-            'level_boarding': self._check_level_boarding
+        # Packed masks live here rather than in the caller's dictionaries
+        self._stop_masks = {
+            stop: stop_feature_mask(stop_data) for stop, stop_data in accessibility_data.items()
         }
+        
+        # Row i of the arrays below belongs to stop i of _stop_index; the extra
+        # trailing row stands in for stops without accessibility data
+        self._stop_index = {stop: i for i, stop in enumerate(self._stop_masks)}
+        self._stop_masks_arr = np.append(
+            np.fromiter(self._stop_masks.values(), dtype=np.uint64, count=len(self._stop_masks)),
+            np.uint64(0)
+        )
+        
+        # Scored feature matrix (stops x features) and weights; scores only
+        # depend on the masks, so compute them all up front
+        self._F = np.stack([
+            (self._stop_masks_arr & np.uint64(FEATURE_BITS[feature])) != 0
+            for feature in SCORE_WEIGHTS
+        ], axis=1).astype(np.uint8)
+        self._W = np.array(list(SCORE_WEIGHTS.values()), dtype=np.float64)
+        self._scores_arr = self._score_matrix(self._F, self._W)
+        
+        # Compiled predicates keyed by required stop mask, see compile_predicate
+        self._predicates = {}
+    
+    def invalidate(self, stop: str):
+        """
+        Re-read one stop's accessibility data after it was changed in place
+        
+        Args:
+            stop: Stop name whose entry in accessibility_data was added or updated
+        """
+        mask = stop_feature_mask(self.accessibility_data.get(stop, {}))
+        
+        i = self._stop_index.get(stop)
+        if i is None:
+            # New stops take the row just before the trailing unknown-stop row
+            i = len(self._stop_index)
+            self._stop_index[stop] = i
+            self._stop_masks_arr = np.insert(self._stop_masks_arr, i, np.uint64(0))
+            self._F = np.insert(self._F, i, 0, axis=0)
+            self._scores_arr = np.insert(self._scores_arr, i, 0.0)
+        
+        # Compiled predicates read _stop_masks by reference, so they see this too
+        self._stop_masks[stop] = mask
+        self._stop_masks_arr[i] = mask
+        self._F[i] = [(mask & FEATURE_BITS[feature]) != 0 for feature in SCORE_WEIGHTS]
+        self._scores_arr[i] = self._score_matrix(self._F[i:i + 1], self._W)[0]
     
     def meets_requirements(self, stop: str, requirements: List[str]) -> bool:
         """
@@ -56,17 +217,8 @@ class AccessibilityFilter:
         Returns:
             True if stop meets all requirements, False otherwise
         """
-        stop_data = self.accessibility_data.get(stop, {})
-        
-        for requirement in requirements:
-            if requirement in self.requirement_checkers:
-                if not self.requirement_checkers[requirement](stop_data):
-                    return False
-            else:
-                # Unknown requirement - assume not met
-                return False
-        
-        return True
+        required, _ = self.compile_requirements(requirements)
+        return (self._stop_masks.get(stop, 0) & required) == required
     
     def edge_meets_requirements(self, from_stop: str, to_stop: str, 
                               edge_data: Dict, requirements: List[str]) -> bool:
@@ -82,66 +234,110 @@ class AccessibilityFilter:
         Returns:
             True if edge meets all requirements, False otherwise
         """
-        # Check if both stops meet requirements
-        if not (self.meets_requirements(from_stop, requirements) and 
-                self.meets_requirements(to_stop, requirements)):
-            return False
-        
-        # Check edge-specific requirements
-        for requirement in requirements:
-            if requirement == 'wheelchair_accessible':
-                if not edge_data.get('wheelchair_accessible', False):
-                    return False
-            elif requirement == 'low_floor_vehicle':
-                if not edge_data.get('low_floor', False):
-                    return False
-            elif requirement == 'wide_doors':
-                if not edge_data.get('wide_doors', False):
-                    return False
-        
-        return True
-    
-    def _check_wheelchair_accessible(self, stop_data: Dict) -> bool:
-        """Check if stop is wheelchair accessible"""
-        return stop_data.get('wheelchair_accessible', False)
-    
-    def _check_no_stairs(self, stop_data: Dict) -> bool:
-        """Check if stop can be accessed without stairs"""
-        has_stairs = stop_data.get('has_stairs', True)
-        has_alternative = stop_data.get('has_elevator', False) or stop_data.get('has_ramp', False)
+        required, edge_required = self.compile_requirements(requirements)
+        stop_masks = self._stop_masks
         
-        # Either no stairs at all, or alternative access available
-        return not has_stairs or has_alternative
-    
-    def _check_working_elevator(self, stop_data: Dict) -> bool:
-        """Check if stop has a working elevator"""
-        has_elevator = stop_data.get('has_elevator', False)
-        elevator_working = stop_data.get('elevator_working', True)
-        return has_elevator and elevator_working
-    
-    def _check_low_floor_vehicle(self, stop_data: Dict) -> bool:
-        """Check if stop serves low-floor vehicles"""
-        return stop_data.get('low_floor_service', False)
+        edge_mask = edge_data.get('_mask')
+        if edge_mask is None:
+            edge_mask = edge_feature_mask(edge_data)
+        
+        # Both stops and the segment itself must provide every required feature
+        return ((stop_masks.get(from_stop, 0) & required) == required and
+                (stop_masks.get(to_stop, 0) & required) == required and
+                (edge_mask & edge_required) == edge_required)
     
-    def _check_audio_announcements(self, stop_data: Dict) -> bool:
-        """Check if stop has audio announcements"""
-        return stop_data.get('audio_announcements', False)
+    def edges_meet_requirements(self, from_stops: List[str], to_stops: List[str],
+                                edge_masks: np.ndarray, requirements: List[str]) -> np.ndarray:
+        """
+        Bulk version of edge_meets_requirements over parallel edge arrays
+        
+        Args:
+            from_stops: Starting stop name of each edge
+            to_stops: Destination stop name of each edge
+            edge_masks: Packed mask of each edge (see DataLoader.edge_mask_array)
+            requirements: List of accessibility requirement strings
+            
+        Returns:
+            Boolean array, True where the edge meets all requirements
+        """
+        from _accel import edges_ok
+        
+        required, edge_required = self.compile_requirements(requirements)
+        return edges_ok(self.stop_mask_array(from_stops), self.stop_mask_array(to_stops),
+                        np.ascontiguousarray(edge_masks, dtype=np.uint64),
+                        np.uint64(required), np.uint64(edge_required))
     
-    def _check_visual_displays(self, stop_data: Dict) -> bool:
-        """Check if stop has visual displays"""
-        return stop_data.get('visual_displays', False)
+    def stop_mask_array(self, stops: List[str]) -> np.ndarray:
+        """
+        Gather the packed feature masks of many stops
+        
+        Args:
+            stops: Stop names
+            
+        Returns:
+            uint64 array of masks; 0 for stops without accessibility data
+        """
+        missing = len(self._stop_index)
+        rows = np.fromiter((self._stop_index.get(stop, missing) for stop in stops),
+                           dtype=np.intp, count=len(stops))
+        return self._stop_masks_arr[rows]
     
-    def _check_tactile_guidance(self, stop_data: Dict) -> bool:
-        """Check if stop has tactile guidance systems"""
-        return stop_data.get('tactile_guidance', False)
+    def compile_predicate(self, requirements: List[str]) -> Callable[[str], bool]:
+        """
+        Build a stop predicate specialized to one list of requirements
+        
+        Args:
+            requirements: List of accessibility requirement strings
+            
+        Returns:
+            Function taking a stop name and returning True if the stop meets all requirements
+        """
+        # Keyed on the compiled mask, which takes at most 2 ** 10 values however
+        # many different requirement lists callers pass
+        required, _ = self.compile_requirements(requirements)
+        predicate = self._predicates.get(required)
+        if predicate is not None:
+            return predicate
+        
+        stop_masks = self._stop_masks
+        
+        if required:
+            def predicate(stop: str) -> bool:
+                return (stop_masks.get(stop, 0) & required) == required
+        else:
+            def predicate(stop: str) -> bool:
+                return True
+        
+        self._predicates[required] = predicate
+        return predicate
     
-    def _check_wide_doors(self, stop_data: Dict) -> bool:
-        """Check if stop has wide doors for accessibility"""
-        return stop_data.get('wide_doors', False)
+    def compile_requirements(self, requirements: List[str]) -> Tuple[int, int]:
+        """
+        Compile a list of accessibility requirements into feature masks
+        
+        Args:
+            requirements: List of accessibility requirement strings
+        
+        Returns:
+            Tuple of (required stop mask, required edge mask)
+        """
+        return _compile_requirements(tuple(requirements))
     
-    def _check_level_boarding(self, stop_data: Dict) -> bool:
-        """Check if stop supports level boarding"""
-        return stop_data.get('level_boarding', False)
+    def filter_edges_bulk(self, edge_masks: np.ndarray, required_edge_mask: int) -> np.ndarray:
+        """
+        Check the edge-level features of many edges at once
+        
+        Args:
+            edge_masks: Array of packed edge masks (see DataLoader.edge_mask_array)
+            required_edge_mask: Required edge mask, e.g. from compile_requirements
+            
+        Returns:
+            Boolean array, True where the edge provides every required feature
+        """
+        from _accel import mask_match
+        
+        masks = np.ascontiguousarray(edge_masks, dtype=np.uint64)
+        return mask_match(masks, np.uint64(required_edge_mask))
     
     def get_accessibility_score(self, stop: str) -> float:
         """
@@ -153,28 +349,27 @@ class AccessibilityFilter:
         Returns:
             Accessibility score between 0.0 (not accessible) and 1.0 (fully accessible)
         """
-        stop_data = self.accessibility_data.get(stop, {})
-        
-        # Define weighted accessibility features
-        features = {
-            'wheelchair_accessible': 0.25,
-            'has_elevator': 0.15,
-            'elevator_working': 0.10,
-            'has_ramp': 0.10,
-            'audio_announcements': 0.10,
-            'visual_displays': 0.10,
-            'tactile_guidance': 0.05,
-            'wide_doors': 0.05,
-            'level_boarding': 0.05,
-            'low_floor_service': 0.05
-        }
+        return float(self._scores_arr[self._stop_index.get(stop, len(self._stop_index))])
+    
+    def _score_matrix(self, features: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        Score every row of a feature matrix against the feature weights
         
-        score = 0.0
-        for feature, weight in features.items():
-            if stop_data.get(feature, False):
-                score += weight
+        Args:
+            features: uint8 matrix of shape (stops, len(SCORE_WEIGHTS))
+            weights: Weight for each feature column
+            
+        Returns:
+            Array of scores between 0.0 and 1.0, one per row
+        """
+        # Accumulate column by column in SCORE_WEIGHTS order rather than
+        # features @ weights: BLAS may reorder the additions, and the level
+        # thresholds sit exactly on sums of weights
+        scores = np.zeros(features.shape[0], dtype=np.float64)
+        for column, weight in enumerate(weights):
+            scores += features[:, column] * weight
         
-        return min(score, 1.0)  # Cap at 1.0
+        return np.minimum(scores, 1.0)  # Cap at 1.0
     
     def get_accessibility_summary(self, stop: str) -> Dict:
         """
@@ -231,7 +426,13 @@ class AccessibilityFilter:
         Returns:
             Filtered list of stops that meet all requirements
         """
-        return [stop for stop in stops if self.meets_requirements(stop, requirements)]
+        stops = list(stops)
+        required = np.uint64(self.compile_requirements(requirements)[0])
+        
+        # Gather every stop's mask in one pass, then compare them all at once
+        keep = (self.stop_mask_array(stops) & required) == required
+        
+        return [stops[i] for i in np.flatnonzero(keep)]
     
     def get_supported_requirements(self) -> List[str]:
         """
@@ -240,7 +441,7 @@ class AccessibilityFilter:
         Returns:
             List of requirement strings
         """
-        return list(self.requirement_checkers.keys())
+        return list(REQUIREMENT_BITS.keys())
     
     def validate_requirements(self, requirements: List[str]) -> Dict:
         """
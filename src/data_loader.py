@@ -3,13 +3,166 @@ Accessible Route Optimizer - Data Loading Module
 Handles loading and parsing of transit network and accessibility data
 """
 
-import pandas as pd
-import networkx as nx
+from __future__ import annotations
+
+import numpy as np
 import json
-import geojson
-from typing import Dict, List, Optional, Union
+import functools
+import hashlib
+import importlib.util
+import os
+import pickle
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+from itertools import compress, islice
 from pathlib import Path
 import csv
+import sys
+import weakref
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; the standard library parser is used without it
+    orjson = None
+
+# pandas, networkx and geojson are imported where they are first needed,
+# so loading accessibility JSON alone stays cheap
+if TYPE_CHECKING:
+    import networkx as nx
+    import pandas as pd
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional; without it GeoJSON files are parsed whole
+    ijson = None
+
+from accessibility import FEATURE_BITS, EDGE_BITS, edge_feature_mask, stop_feature_mask
+
+
+# Accessibility summary counters and the stop feature each one counts
+_SUMMARY_FEATURES = {
+    'wheelchair_accessible_stops': 'wheelchair_accessible',
+    'stops_with_elevators': 'has_elevator',
+    'stops_with_ramps': 'has_ramp',
+    'stops_with_audio': 'audio_announcements',
+    'stops_with_visual': 'visual_displays'
+}
+
+
+class CSRGraph(NamedTuple):
+    """
+    Compressed sparse row (CSR) layout of an undirected transit graph
+    
+    Every edge is stored once per direction; the slots of node i are
+    indptr[i]:indptr[i + 1], ordered by neighbor index.
+    """
+    nodes: List[str]                   # node name for each index
+    node_index: Dict[str, int]         # index for each node name
+    indptr: np.ndarray                 # int32, len(nodes) + 1 row offsets
+    indices: np.ndarray                # int32 neighbor index per slot
+    edge_mask: Optional[np.ndarray]    # uint64 packed edge mask per slot
+    travel_time: Optional[np.ndarray]  # float64 travel time per slot, NaN if missing
+
+
+# Parse CSV files with the multithreaded PyArrow reader when pyarrow is installed
+_CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
+# Set this environment variable to 'polars' to parse CSV files with polars instead
+_FAST_IO_ENV = 'ARO_FAST_IO'
+
+# GTFS times can run past 24:00:00, so they are always read as strings
+_STOP_TIMES_STRING_COLUMNS = ('arrival_time', 'departure_time')
+
+# Columns read from each GTFS table; everything else in the feed is skipped
+_GTFS_COLUMNS = {
+    'stops.txt': ('stop_id', 'stop_name'),
+    'stop_times.txt': ('trip_id', 'arrival_time', 'departure_time', 'stop_id', 'stop_sequence'),
+    'trips.txt': ('trip_id', 'route_id', 'wheelchair_accessible'),
+    'routes.txt': ('route_id', 'route_short_name', 'route_type')
+}
+
+# Default location of parsed-data cache files used by the command-line interface
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'aro'
+
+# Bump when loader output changes so stale cache entries are ignored
+_CACHE_VERSION = 4
+
+# String spellings accepted as True in boolean fields
+_TRUE_STRINGS = ['true', '1', 'yes', 'y', 't']
+
+# Edges buffered before each add_edges_from call while streaming GeoJSON
+_EDGE_BATCH_SIZE = 10000
+
+# How each known accessibility field is normalized
+_BOOLEAN_FIELD, _STRING_FIELD, _NUMERIC_FIELD = 0, 1, 2
+_FIELD_KINDS = {
+    'wheelchair_accessible': _BOOLEAN_FIELD,
+    'has_elevator': _BOOLEAN_FIELD,
+    'has_stairs': _BOOLEAN_FIELD,
+    'has_ramp': _BOOLEAN_FIELD,
+    'elevator_working': _BOOLEAN_FIELD,
+    'audio_announcements': _BOOLEAN_FIELD,
+    'visual_displays': _BOOLEAN_FIELD,
+    'tactile_guidance': _BOOLEAN_FIELD,
+    'wide_doors': _BOOLEAN_FIELD,
+    'level_boarding': _BOOLEAN_FIELD,
+    'low_floor_service': _BOOLEAN_FIELD,
+    'platform_gap': _STRING_FIELD,
+    'surface_type': _STRING_FIELD,
+    'lighting_quality': _STRING_FIELD,
+    'platform_width': _NUMERIC_FIELD,
+    'door_width': _NUMERIC_FIELD,
+    'ramp_grade': _NUMERIC_FIELD
+}
+
+
+def _file_cached(kind: str):
+    """
+    Cache a loader's result in a pickle file keyed by the content of its input
+    
+    Args:
+        kind: Short name of the loaded data, used in cache file names
+        
+    Returns:
+        Decorator for DataLoader methods taking a file path
+    """
+    def decorator(load_method):
+        @functools.wraps(load_method)
+        def wrapper(self, file_path, *args, **kwargs):
+            # Only plain loads are cached; options such as a GeoJSON bbox change the result
+            if self.cache_dir is None or args or kwargs:
+                return load_method(self, file_path, *args, **kwargs)
+            
+            try:
+                digest = hashlib.sha1(Path(file_path).read_bytes()).hexdigest()
+            except OSError:
+                # Let the loader report the unreadable file
+                return load_method(self, file_path)
+            
+            cache_path = Path(self.cache_dir) / f"{kind}-v{_CACHE_VERSION}-{digest}.pkl"
+            try:
+                with open(cache_path, 'rb') as file:
+                    result = pickle.load(file)
+                print(f"Loaded cached {kind} data for {file_path}")
+                return result
+            except Exception:
+                # Missing or unreadable cache entry; parse the file and rewrite it
+                pass
+            
+            result = load_method(self, file_path)
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+                with open(temp_path, 'wb') as file:
+                    pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, cache_path)
+            except OSError:
+                # Caching is best effort, e.g. the cache directory may be read-only
+                pass
+            return result
+        return wrapper
+    return decorator
 
 
 class DataLoader:
@@ -17,15 +170,49 @@ class DataLoader:
     Handles loading and parsing of various data formats for transit networks
     """
     
-    def __init__(self):
-        """Initialize the data loader"""
+    __slots__ = ('supported_formats', 'cache_dir', '_summary_cache', '_summary_key', '_csr_cache', '_csr_key')
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the data loader
+        
+        Args:
+            cache_dir: Directory for cached parse results; None disables caching
+        """
+        self.cache_dir = cache_dir
+        
+        # Loader method for each format, resolved on use by load()
         self.supported_formats = {
-            'csv': self.load_transit_csv,
-            'geojson': self.load_transit_geojson,
-            'json': self.load_accessibility_json,
-            'gtfs': self.load_gtfs_data
+            'csv': 'load_transit_csv',
+            'geojson': 'load_transit_geojson',
+            'json': 'load_accessibility_json',
+            'gtfs': 'load_gtfs_data'
         }
+        
+        # Summary cache and the key of the data it was computed for, see get_data_summary
+        self._summary_cache: Optional[Dict] = None
+        self._summary_key: Optional[Tuple] = None
+        
+        # CSR structure used by validate_data_consistency and the key of its graph
+        self._csr_cache: Optional[CSRGraph] = None
+        self._csr_key: Optional[Tuple] = None
+    
+    def load(self, file_path: str, file_format: str) -> Union[nx.Graph, Dict]:
+        """
+        Load a file with the loader registered for its format
+        
+        Args:
+            file_path: Path to the file or GTFS folder
+            file_format: One of the keys of supported_formats
+            
+        Returns:
+            Transit network graph, or accessibility data for 'json'
+        """
+        if file_format not in self.supported_formats:
+            raise ValueError(f"Unsupported format: {file_format}")
+        return getattr(self, self.supported_formats[file_format])(file_path)
     
+    @_file_cached('csv')
     def load_transit_csv(self, file_path: str) -> nx.Graph:
         """
         Load transit network from CSV file
@@ -36,8 +223,9 @@ class DataLoader:
         Returns:
             NetworkX Graph representing the transit network
         """
+        import networkx as nx
         try:
-            df = pd.read_csv(file_path)
+            df = self._read_csv(file_path)
             
             # Validate required columns
             required_columns = ['from_stop', 'to_stop', 'travel_time']
@@ -45,30 +233,277 @@ class DataLoader:
             if missing_columns:
                 raise ValueError(f"Missing required columns: {missing_columns}")
             
-            # Create graph
-            graph = nx.Graph()
+            # Normalize whole columns once instead of once per row,
+            # sharing one string per stop name
+            for col in ['from_stop', 'to_stop']:
+                df[col] = df[col].astype(str).str.strip().map(sys.intern)
+            df['travel_time'] = df['travel_time'].astype(float)
+            df['route_id'] = df['route_id'].fillna('unknown').astype(str) if 'route_id' in df.columns else 'unknown'
+            self._vectorize_booleans(df, {
+                'wheelchair_accessible': False,
+                'has_elevator': False,
+                'has_stairs': True,
+                'low_floor': False,
+                'wide_doors': False
+            })
+            
+            # Pack the edge booleans column-wise (see accessibility.EDGE_BITS)
+            df['_mask'] = 0
+            for col, bit in EDGE_BITS.items():
+                df['_mask'] |= df[col].astype('int64') * bit
+            
+            # Known attributes first, then any additional columns present
+            known_columns = ['travel_time', 'route_id', 'wheelchair_accessible', 'has_elevator',
+                             'has_stairs', 'low_floor', 'wide_doors', '_mask']
+            attr_columns = known_columns + [
+                col for col in df.columns if col not in ['from_stop', 'to_stop'] and col not in known_columns
+            ]
+            
+            # Create graph with all edges and their attributes in one call; from_pandas_edgelist
+            # clears any graph passed as create_using, so the mask schema is attached afterwards
+            graph = nx.from_pandas_edgelist(df, 'from_stop', 'to_stop', edge_attr=attr_columns)
+            graph.graph.update(self._new_graph().graph)
+            
+            print(f"Loaded transit network: {graph.number_of_nodes()} stops, {graph.number_of_edges()} connections")
+            return graph
+            
+        except Exception as e:
+            raise ValueError(f"Error loading CSV file {file_path}: {str(e)}")
+    
+    def _read_csv(self, file_path: Union[str, Path], string_columns: Sequence[str] = (),
+                  columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Read a CSV file with the fastest parser available
+        
+        Args:
+            file_path: Path to CSV file
+            string_columns: Columns to keep as strings instead of inferring a type
+            columns: Columns to read if present in the file; None reads all of them
             
-            # Group by trip to create sequential connections
-            for trip_id, trip_stops in merged_df.groupby('trip_id'):
-                trip_stops = trip_stops.sort_values('stop_sequence')
-                stops_list = trip_stops.to_dict('records')
+        Returns:
+            DataFrame with NumPy-backed columns
+        """
+        import pandas as pd
+        usecols = None
+        if columns is not None:
+            # Optional columns may be absent, so select from what the header provides
+            with open(file_path, newline='', encoding='utf-8-sig') as file:
+                header = next(csv.reader(file), [])
+            usecols = [col for col in header if col in columns]
+            string_columns = [col for col in string_columns if col in usecols]
+        
+        if os.getenv(_FAST_IO_ENV) == 'polars':
+            try:
+                import polars as pl
+            except ImportError:
+                # polars is optional; fall back to pandas below
+                pl = None
+            if pl is not None:
+                return pl.read_csv(
+                    file_path, columns=usecols, schema_overrides={col: pl.Utf8 for col in string_columns}
+                ).to_pandas()
+        
+        dtype = {col: str for col in string_columns} or None
+        return pd.read_csv(file_path, engine=_CSV_ENGINE, dtype=dtype, usecols=usecols)
+    
+    def _new_graph(self) -> nx.Graph:
+        """
+        Create an empty transit graph tagged with the packed-mask schema
+        
+        Returns:
+            Empty NetworkX Graph whose graph attributes describe the mask bits
+        """
+        import networkx as nx
+        graph = nx.Graph()
+        graph.graph['feature_bits'] = FEATURE_BITS
+        graph.graph['edge_bits'] = EDGE_BITS
+        return graph
+    
+    @_file_cached('accessibility')
+    def load_accessibility_json(self, file_path: str) -> Dict:
+        """
+        Load accessibility metadata from JSON file
+        
+        Args:
+            file_path: Path to JSON file
+            
+        Returns:
+            Dictionary with accessibility data for stops
+        """
+        try:
+            with open(file_path, 'rb') as file:
+                raw = file.read()
+            accessibility_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            
+            # Validate and normalize the data
+            normalized_data = {}
+            for stop_name, stop_data in accessibility_data.items():
+                normalized_data[sys.intern(str(stop_name).strip())] = self._normalize_accessibility_data(stop_data)
+            
+            print(f"Loaded accessibility data for {len(normalized_data)} stops")
+            return normalized_data
+            
+        except FileNotFoundError:
+            print(f"Warning: Accessibility file {file_path} not found. Using empty accessibility data.")
+            return {}
+        except Exception as e:
+            raise ValueError(f"Error loading accessibility JSON file {file_path}: {str(e)}")
+    
+    @_file_cached('geojson')
+    def load_transit_geojson(self, file_path: str,
+                             bbox: Optional[Tuple[float, float, float, float]] = None) -> nx.Graph:
+        """
+        Load transit network from GeoJSON file
+        
+        Args:
+            file_path: Path to GeoJSON file
+            bbox: Optional (min_x, min_y, max_x, max_y); only segments with both
+                endpoints inside the box are loaded
+            
+        Returns:
+            NetworkX Graph representing the transit network
+        """
+        try:
+            graph = self._new_graph()
+            edges = []
+            edge_mask = edge_feature_mask({})
+            
+            # Process features one at a time
+            for feature in self._iter_geojson_features(file_path):
+                geometry = feature['geometry']
+                if geometry['type'] != 'LineString':
+                    continue
+                
+                # Extract coordinates (simplified - assumes stops are at endpoints)
+                coords = geometry['coordinates']
+                if len(coords) < 2:
+                    continue
+                start, end = coords[0], coords[-1]
+                
+                # Skip segments outside the box before any formatting work
+                if bbox is not None and not (bbox[0] <= start[0] <= bbox[2] and bbox[1] <= start[1] <= bbox[3] and
+                                             bbox[0] <= end[0] <= bbox[2] and bbox[1] <= end[1] <= bbox[3]):
+                    continue
+                
+                # Extract route information from properties
+                props = feature['properties']
+                route_id = props.get('route_id', 'unknown')
+                
+                from_stop = sys.intern(f"Stop_{start[0]:.6f}_{start[1]:.6f}")
+                to_stop = sys.intern(f"Stop_{end[0]:.6f}_{end[1]:.6f}")
                 
-                # Create edges between consecutive stops
-                for i in range(len(stops_list) - 1):
-                    from_stop = stops_list[i]['stop_name']
-                    to_stop = stops_list[i + 1]['stop_name']
-                    
-                    # Calculate travel time (simplified)
-                    from_time = self._parse_gtfs_time(stops_list[i]['departure_time'])
-                    to_time = self._parse_gtfs_time(stops_list[i + 1]['arrival_time'])
-                    travel_time = max(1, (to_time - from_time) / 60)  # Convert to minutes
-                    
-                    # Add edge with route information
-                    graph.add_edge(from_stop, to_stop,
-                                 travel_time=travel_time,
-                                 route_id=stops_list[i]['route_short_name'],
-                                 route_type=stops_list[i]['route_type'],
-                                 wheelchair_accessible=stops_list[i].get('wheelchair_accessible', 0) == 1)
+                # Calculate approximate travel time (simplified)
+                travel_time = props.get('travel_time', 5)  # Default 5 minutes
+                
+                edges.append((from_stop, to_stop, {
+                    'travel_time': travel_time,
+                    'route_id': route_id,
+                    'coordinates': coords,
+                    '_mask': edge_mask
+                }))
+                if len(edges) >= _EDGE_BATCH_SIZE:
+                    graph.add_edges_from(edges)
+                    edges.clear()
+            
+            graph.add_edges_from(edges)
+            
+            print(f"Loaded GeoJSON transit network: {graph.number_of_nodes()} stops, {graph.number_of_edges()} connections")
+            return graph
+            
+        except Exception as e:
+            raise ValueError(f"Error loading GeoJSON file {file_path}: {str(e)}")
+    
+    def _iter_geojson_features(self, file_path: str):
+        """
+        Yield the features of a GeoJSON FeatureCollection one at a time
+        
+        Args:
+            file_path: Path to GeoJSON file
+            
+        Yields:
+            Feature dictionaries, streamed from disk when ijson is installed
+        """
+        if ijson is not None:
+            with open(file_path, 'rb') as file:
+                yield from ijson.items(file, 'features.item', use_float=True)
+        else:
+            import geojson
+            with open(file_path, 'r', encoding='utf-8') as file:
+                yield from geojson.load(file)['features']
+    
+    def load_gtfs_data(self, gtfs_folder: str) -> nx.Graph:
+        """
+        Load transit network from GTFS (General Transit Feed Specification) data
+        
+        Args:
+            gtfs_folder: Path to folder containing GTFS files
+            
+        Returns:
+            NetworkX Graph representing the transit network
+        """
+        import networkx as nx
+        import pandas as pd
+        from _accel import trip_travel_times
+        try:
+            gtfs_path = Path(gtfs_folder)
+            
+            # Load required GTFS files
+            stops_df = self._read_csv(gtfs_path / 'stops.txt', columns=_GTFS_COLUMNS['stops.txt'])
+            stop_times_df = self._read_csv(gtfs_path / 'stop_times.txt', _STOP_TIMES_STRING_COLUMNS,
+                                          _GTFS_COLUMNS['stop_times.txt'])
+            stop_times_df['_arr_s'] = self._parse_gtfs_time_column(stop_times_df['arrival_time'])
+            stop_times_df['_dep_s'] = self._parse_gtfs_time_column(stop_times_df['departure_time'])
+            trips_df = self._read_csv(gtfs_path / 'trips.txt', columns=_GTFS_COLUMNS['trips.txt'])
+            routes_df = self._read_csv(gtfs_path / 'routes.txt', columns=_GTFS_COLUMNS['routes.txt'])
+            
+            # Join on shared categoricals so merges compare integer codes, not strings
+            self._share_categories('trip_id', stop_times_df, trips_df)
+            self._share_categories('route_id', trips_df, routes_df)
+            self._share_categories('stop_id', stop_times_df, stops_df)
+            stops_df['stop_name'] = stops_df['stop_name'].astype('category')
+            
+            # Merge data to create connections
+            merged_df = stop_times_df.merge(trips_df, on='trip_id')
+            merged_df = merged_df.merge(routes_df, on='route_id')
+            merged_df = merged_df.merge(stops_df, left_on='stop_id', right_on='stop_id')
+            
+            # Consecutive stop times of one trip form an edge: pair every row with the next
+            merged_df = merged_df.sort_values(['trip_id', 'stop_sequence'])
+            if 'wheelchair_accessible' not in merged_df.columns:
+                merged_df['wheelchair_accessible'] = 0
+            
+            # Calculate travel time (simplified) in minutes; -1 marks the last stop of a trip
+            travel_times = trip_travel_times(
+                merged_df['trip_id'].cat.codes.to_numpy(dtype=np.int32),
+                merged_df['_arr_s'].to_numpy(dtype=np.int32),
+                merged_df['_dep_s'].to_numpy(dtype=np.int32)
+            )
+            same_trip = travel_times > 0
+            
+            # Stop names repeat once per visit; share one string per name
+            stop_names = merged_df['stop_name'].map(
+                lambda name: sys.intern(name) if isinstance(name, str) else name
+            )
+            wheelchair_accessible = (merged_df['wheelchair_accessible'] == 1).to_numpy()
+            edge_masks = np.where(wheelchair_accessible,
+                                  edge_feature_mask({'wheelchair_accessible': True}),
+                                  edge_feature_mask({'wheelchair_accessible': False}))
+            
+            edges_df = pd.DataFrame({
+                'from_stop': stop_names,
+                'to_stop': stop_names.shift(-1),
+                'travel_time': travel_times,
+                'route_id': merged_df['route_short_name'],
+                'route_type': merged_df['route_type'],
+                'wheelchair_accessible': wheelchair_accessible,
+                '_mask': edge_masks
+            })[same_trip]
+            
+            # Create graph; later stop times of a repeated stop pair overwrite earlier ones
+            graph = nx.from_pandas_edgelist(edges_df, 'from_stop', 'to_stop', edge_attr=[
+                'travel_time', 'route_id', 'route_type', 'wheelchair_accessible', '_mask'
+            ])
+            graph.graph.update(self._new_graph().graph)
             
             print(f"Loaded GTFS transit network: {graph.number_of_nodes()} stops, {graph.number_of_edges()} connections")
             return graph
@@ -76,6 +511,21 @@ class DataLoader:
         except Exception as e:
             raise ValueError(f"Error loading GTFS data from {gtfs_folder}: {str(e)}")
     
+    def _share_categories(self, column: str, *frames: pd.DataFrame):
+        """
+        Convert a key column to one categorical dtype shared by several DataFrames
+        
+        Args:
+            column: Key column present in every frame
+            frames: DataFrames converted in place
+        """
+        import pandas as pd
+        values = pd.concat([frame[column] for frame in frames], ignore_index=True)
+        # Sorted categories keep sort_values on the key in natural value order
+        dtype = pd.CategoricalDtype(pd.Index(values.dropna().unique()).sort_values())
+        for frame in frames:
+            frame[column] = frame[column].astype(dtype)
+    
     def _parse_gtfs_time(self, time_str: str) -> int:
         """
         Parse GTFS time format (HH:MM:SS) to seconds since midnight
@@ -95,6 +545,22 @@ class DataLoader:
         except:
             return 0
     
+    def _parse_gtfs_time_column(self, times: pd.Series) -> pd.Series:
+        """
+        Parse a whole column of GTFS times (HH:MM:SS) to seconds since midnight
+        
+        Args:
+            times: Series of time strings
+            
+        Returns:
+            int32 Series of seconds since midnight; unparseable entries become 0
+        """
+        import pandas as pd
+        parts = times.astype(str).str.split(':', expand=True).reindex(columns=range(3))
+        parts = parts.apply(pd.to_numeric, errors='coerce')
+        seconds = parts[0] * 3600 + parts[1] * 60 + parts[2]
+        return seconds.fillna(0).astype('int32')
+    
     def _parse_boolean(self, value: Union[str, bool, int]) -> bool:
         """
         Parse various boolean representations
@@ -110,9 +576,40 @@ class DataLoader:
         if isinstance(value, int):
             return value != 0
         if isinstance(value, str):
-            return value.lower() in ['true', '1', 'yes', 'y', 't']
+            return value.lower() in _TRUE_STRINGS
         return False
     
+    def _vectorize_booleans(self, df: pd.DataFrame, columns: Dict[str, bool]):
+        """
+        Parse boolean columns in place with one vectorized pass per column
+        
+        Args:
+            df: DataFrame whose columns are converted
+            columns: Column names mapped to the default used when a column is absent
+        """
+        for col, default in columns.items():
+            if col not in df.columns:
+                df[col] = default
+                continue
+            df[col] = self._parse_boolean_series(df[col])
+    
+    def _parse_boolean_series(self, series: pd.Series) -> np.ndarray:
+        """
+        Parse a whole column of boolean representations at once
+        
+        Args:
+            series: Column of booleans, numbers or strings
+            
+        Returns:
+            Boolean ndarray, False wherever a value is missing
+        """
+        import pandas as pd
+        if pd.api.types.is_bool_dtype(series):
+            return series.fillna(False).to_numpy(dtype=bool)
+        if pd.api.types.is_numeric_dtype(series):
+            return series.fillna(0).to_numpy(dtype=np.float64) != 0
+        return series.astype(str).str.strip().str.lower().isin(_TRUE_STRINGS).to_numpy(dtype=bool)
+    
     def _normalize_accessibility_data(self, stop_data: Dict) -> Dict:
         """
         Normalize accessibility data for a stop
@@ -125,34 +622,86 @@ class DataLoader:
         """
         normalized = {}
         
-        # Boolean fields
-        boolean_fields = [
-            'wheelchair_accessible', 'has_elevator', 'has_stairs', 'has_ramp',
-            'elevator_working', 'audio_announcements', 'visual_displays',
-            'tactile_guidance', 'wide_doors', 'level_boarding', 'low_floor_service'
-        ]
-        
-        for field in boolean_fields:
-            if field in stop_data:
-                normalized[field] = self._parse_boolean(stop_data[field])
-        
-        # String fields
-        string_fields = ['platform_gap', 'surface_type', 'lighting_quality']
-        for field in string_fields:
-            if field in stop_data:
-                normalized[field] = str(stop_data[field]).lower()
-        
-        # Numeric fields
-        numeric_fields = ['platform_width', 'door_width', 'ramp_grade']
-        for field in numeric_fields:
-            if field in stop_data:
+        # One pass over the stop's own fields; unknown fields are dropped
+        for field, value in stop_data.items():
+            kind = _FIELD_KINDS.get(field)
+            if kind == _BOOLEAN_FIELD:
+                normalized[field] = self._parse_boolean(value)
+            elif kind == _STRING_FIELD:
+                normalized[field] = str(value).lower()
+            elif kind == _NUMERIC_FIELD:
                 try:
-                    normalized[field] = float(stop_data[field])
+                    normalized[field] = float(value)
                 except ValueError:
                     pass
         
         return normalized
     
+    def edge_mask_array(self, graph: nx.Graph) -> Tuple[np.ndarray, List[Tuple[str, str]]]:
+        """
+        Collect the packed edge masks of a graph into one contiguous array
+        
+        Args:
+            graph: Transit network graph
+            
+        Returns:
+            Tuple of (uint64 array of edge masks, (from_stop, to_stop) for each array index)
+        """
+        edges = []
+        masks = []
+        for u, v, data in graph.edges(data=True):
+            edges.append((u, v))
+            mask = data.get('_mask')
+            masks.append(edge_feature_mask(data) if mask is None else mask)
+        
+        return np.array(masks, dtype=np.uint64), edges
+    
+    def to_csr(self, graph: nx.Graph, attributes: bool = True) -> CSRGraph:
+        """
+        Convert a transit graph to compressed sparse row arrays
+        
+        Args:
+            graph: Transit network graph
+            attributes: Whether to gather edge masks and travel times; without
+                them edge_mask and travel_time are None and only the structure is built
+            
+        Returns:
+            CSRGraph with contiguous neighbor, mask and travel time arrays
+        """
+        nodes = list(graph.nodes())
+        node_index = {node: i for i, node in enumerate(nodes)}
+        
+        # One slot per direction of every edge (self-loops appear once),
+        # gathered a row at a time since adjacency() yields nodes in index order
+        degrees = []
+        indices = []
+        edge_mask = []
+        travel_time = []
+        for _, neighbors in graph.adjacency():
+            degrees.append(len(neighbors))
+            indices.extend(map(node_index.__getitem__, neighbors))
+            if attributes:
+                travel_time.extend([data.get('travel_time', np.nan) for data in neighbors.values()])
+                edge_mask.extend([edge_feature_mask(data) if data.get('_mask') is None else data['_mask']
+                                  for data in neighbors.values()])
+        
+        degrees = np.array(degrees, dtype=np.int32)
+        rows = np.repeat(np.arange(len(nodes), dtype=np.int32), degrees)
+        indices = np.array(indices, dtype=np.int32)
+        order = np.lexsort((indices, rows))
+        
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int32)
+        np.cumsum(degrees, out=indptr[1:])
+        
+        return CSRGraph(
+            nodes=nodes,
+            node_index=node_index,
+            indptr=indptr,
+            indices=indices[order],
+            edge_mask=np.array(edge_mask, dtype=np.uint64)[order] if attributes else None,
+            travel_time=np.array(travel_time, dtype=np.float64)[order] if attributes else None
+        )
+    
     def export_transit_csv(self, graph: nx.Graph, file_path: str):
         """
         Export transit network graph to CSV format
@@ -161,6 +710,7 @@ class DataLoader:
             graph: NetworkX graph to export
             file_path: Output CSV file path
         """
+        import pandas as pd
         try:
             edges_data = []
             
@@ -168,7 +718,8 @@ class DataLoader:
                 edge_data = {
                     'from_stop': u,
                     'to_stop': v,
-                    **data
+                    # Packed masks are rebuilt on load, so keep them out of the file
+                    **{key: value for key, value in data.items() if not key.startswith('_')}
                 }
                 edges_data.append(edge_data)
             
@@ -188,8 +739,16 @@ class DataLoader:
             file_path: Output JSON file path
         """
         try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                json.dump(accessibility_data, file, indent=2, ensure_ascii=False)
+            export_data = {
+                stop: {key: value for key, value in stop_data.items() if not key.startswith('_')}
+                for stop, stop_data in accessibility_data.items()
+            }
+            if orjson is not None:
+                with open(file_path, 'wb') as file:
+                    file.write(orjson.dumps(export_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(file_path, 'w', encoding='utf-8') as file:
+                    json.dump(export_data, file, indent=2, ensure_ascii=False)
             print(f"Exported accessibility data to {file_path}")
             
         except Exception as e:
@@ -206,60 +765,132 @@ class DataLoader:
         Returns:
             Dictionary with validation results
         """
+        from _accel import count_components, njit
         results = {
             'valid': True,
             'warnings': [],
             'errors': []
         }
         
-        # Check for stops in graph but not in accessibility data
-        graph_stops = set(graph.nodes())
-        accessibility_stops = set(accessibility_data.keys())
+        nodes = list(graph.nodes())
+        node_index = {node: i for i, node in enumerate(nodes)}
         
-        missing_accessibility = graph_stops - accessibility_stops
-        if missing_accessibility:
+        # Stop ids of accessibility entries, -1 where the stop is not in the graph
+        accessibility_ids = np.fromiter(
+            (node_index.get(stop, -1) for stop in accessibility_data),
+            dtype=np.int32, count=len(accessibility_data)
+        )
+        
+        # Check for stops in graph but not in accessibility data
+        missing_ids = np.setdiff1d(np.arange(len(nodes), dtype=np.int32),
+                                   accessibility_ids[accessibility_ids >= 0], assume_unique=True)
+        if missing_ids.size:
+            # Only the stops shown in the message are turned back into names
+            missing_accessibility = [nodes[i] for i in missing_ids[:10]]
             results['warnings'].append(
-                f"Stops without accessibility data: {list(missing_accessibility)[:10]}..."
-                if len(missing_accessibility) > 10 else 
-                f"Stops without accessibility data: {list(missing_accessibility)}"
+                f"Stops without accessibility data: {missing_accessibility}..."
+                if missing_ids.size > 10 else 
+                f"Stops without accessibility data: {missing_accessibility}"
             )
         
         # Check for accessibility data without corresponding stops
-        extra_accessibility = accessibility_stops - graph_stops
-        if extra_accessibility:
+        unknown = accessibility_ids < 0
+        num_extra = int(np.count_nonzero(unknown))
+        if num_extra:
+            extra_accessibility = list(islice(compress(accessibility_data, unknown), 10))
             results['warnings'].append(
-                f"Accessibility data for non-existent stops: {list(extra_accessibility)[:10]}..."
-                if len(extra_accessibility) > 10 else
-                f"Accessibility data for non-existent stops: {list(extra_accessibility)}"
+                f"Accessibility data for non-existent stops: {extra_accessibility}..."
+                if num_extra > 10 else
+                f"Accessibility data for non-existent stops: {extra_accessibility}"
             )
         
         # Check for disconnected components
-        if not nx.is_connected(graph):
-            components = list(nx.connected_components(graph))
+        if njit is None:
+            # Without Numba, networkx's search beats an interpreted union-find
+            import networkx as nx
+            num_components = nx.number_connected_components(graph)
+        else:
+            csr = self._csr_structure(graph)
+            num_components = count_components(csr.indptr, csr.indices)
+        if num_components > 1:
             results['warnings'].append(
-                f"Network has {len(components)} disconnected components"
+                f"Network has {num_components} disconnected components"
             )
         
-        # Check for negative travel times
-        negative_times = []
-        for u, v, data in graph.edges(data=True):
-            if data.get('travel_time', 0) <= 0:
-                negative_times.append((u, v))
+        # Check for negative travel times (missing times are NaN and count as non-positive),
+        # reading each edge once rather than once per CSR direction
+        travel_times = np.fromiter(
+            (data.get('travel_time', np.nan) for _, _, data in graph.edges(data=True)),
+            dtype=np.float64, count=graph.number_of_edges()
+        )
+        bad = ~(travel_times > 0)
+        num_bad = int(np.count_nonzero(bad))
         
-        if negative_times:
+        if num_bad:
+            negative_times = list(islice(compress(graph.edges(), bad), 5))
             results['errors'].append(
-                f"Edges with non-positive travel times: {negative_times[:5]}..."
-                if len(negative_times) > 5 else
+                f"Edges with non-positive travel times: {negative_times}..."
+                if num_bad > 5 else
                 f"Edges with non-positive travel times: {negative_times}"
             )
             results['valid'] = False
         
         return results
     
+    def _csr_structure(self, graph: nx.Graph) -> CSRGraph:
+        """
+        Get the CSR structure of a graph, see to_csr(attributes=False)
+        
+        The structure is reused until another graph is passed or stops or
+        segments are added or removed. Attributes are not part of it, so
+        edits to them need no invalidation; after replacing segments without
+        changing their count call invalidate_summary().
+        """
+        # The graph is held weakly so the cache does not keep it alive
+        key = (weakref.ref(graph), graph.number_of_nodes(), graph.number_of_edges())
+        if self._csr_cache is None or key != self._csr_key:
+            self._csr_cache = self.to_csr(graph, attributes=False)
+            self._csr_key = key
+        return self._csr_cache
+    
     def get_data_summary(self, graph: nx.Graph, accessibility_data: Dict) -> Dict:
         """
         Generate summary statistics for loaded data
         
+        The summary is cached until another graph or accessibility dictionary
+        is passed, or stops, segments or accessibility entries are added or
+        removed. Checking every attribute would cost as much as the summary
+        itself, so after editing existing segments or stops in place, e.g.
+        through AccessibleRouter.update_accessibility, call invalidate_summary().
+        
+        Args:
+            graph: Transit network graph
+            accessibility_data: Accessibility data dictionary
+            
+        Returns:
+            Dictionary with summary statistics
+        """
+        # The graph is held weakly so the cache does not keep it alive
+        key = (weakref.ref(graph), id(accessibility_data), graph.number_of_nodes(),
+               graph.number_of_edges(), len(accessibility_data))
+        if self._summary_cache is None or key != self._summary_key:
+            self._summary_cache = self._compute_data_summary(graph, accessibility_data)
+            self._summary_key = key
+        
+        # Sections hold only numbers, so copying them keeps the cached summary intact
+        return {section: dict(stats) for section, stats in self._summary_cache.items()}
+    
+    def invalidate_summary(self):
+        """Drop the cached data summary and CSR structure so the next call recomputes them"""
+        self._summary_cache = None
+        self._summary_key = None
+        self._csr_cache = None
+        self._csr_key = None
+    
+    def _compute_data_summary(self, graph: nx.Graph, accessibility_data: Dict) -> Dict:
+        """
+        Compute summary statistics for loaded data
+        
         Args:
             graph: Transit network graph
             accessibility_data: Accessibility data dictionary
@@ -267,182 +898,49 @@ class DataLoader:
         Returns:
             Dictionary with summary statistics
         """
-        # Graph statistics
+        import networkx as nx
+        num_stops = graph.number_of_nodes()
+        num_edges = graph.number_of_edges()
+        num_components = nx.number_connected_components(graph)
+        
+        # Graph statistics; degrees of an undirected graph sum to twice the edge count
         graph_stats = {
-            'total_stops': graph.number_of_nodes(),
-            'total_connections': graph.number_of_edges(),
-            'average_degree': sum(dict(graph.degree()).values()) / graph.number_of_nodes() if graph.number_of_nodes() > 0 else 0,
-            'is_connected': nx.is_connected(graph),
-            'number_of_components': nx.number_connected_components(graph)
+            'total_stops': num_stops,
+            'total_connections': num_edges,
+            'average_degree': 2 * num_edges / num_stops if num_stops > 0 else 0,
+            'is_connected': num_components == 1,
+            'number_of_components': num_components
         }
         
         # Route statistics
-        routes = set()
-        travel_times = []
-        for u, v, data in graph.edges(data=True):
-            routes.add(data.get('route_id', 'unknown'))
-            travel_times.append(data.get('travel_time', 0))
+        routes = {route for _, _, route in graph.edges(data='route_id', default='unknown')}
+        travel_times = np.fromiter(
+            (time for _, _, time in graph.edges(data='travel_time', default=0)),
+            dtype=np.float64, count=num_edges
+        )
         
         graph_stats.update({
             'unique_routes': len(routes),
-            'avg_travel_time': sum(travel_times) / len(travel_times) if travel_times else 0,
-            'min_travel_time': min(travel_times) if travel_times else 0,
-            'max_travel_time': max(travel_times) if travel_times else 0
+            'avg_travel_time': float(travel_times.mean()) if travel_times.size else 0,
+            'min_travel_time': float(travel_times.min()) if travel_times.size else 0,
+            'max_travel_time': float(travel_times.max()) if travel_times.size else 0
         })
         
-        # Accessibility statistics
-        accessibility_stats = {
-            'stops_with_accessibility_data': len(accessibility_data),
-            'wheelchair_accessible_stops': 0,
-            'stops_with_elevators': 0,
-            'stops_with_ramps': 0,
-            'stops_with_audio': 0,
-            'stops_with_visual': 0
-        }
+        # Accessibility statistics, counted from the packed stop masks
+        masks = np.fromiter(
+            (stop_feature_mask(stop_data) for stop_data in accessibility_data.values()),
+            dtype=np.uint64, count=len(accessibility_data)
+        )
+        bits = np.array([FEATURE_BITS[feature] for feature in _SUMMARY_FEATURES.values()], dtype=np.uint64)
+        counts = ((masks[:, None] & bits) != 0).sum(axis=0)
         
-        for stop_data in accessibility_data.values():
-            if stop_data.get('wheelchair_accessible', False):
-                accessibility_stats['wheelchair_accessible_stops'] += 1
-            if stop_data.get('has_elevator', False):
-                accessibility_stats['stops_with_elevators'] += 1
-            if stop_data.get('has_ramp', False):
-                accessibility_stats['stops_with_ramps'] += 1
-            if stop_data.get('audio_announcements', False):
-                accessibility_stats['stops_with_audio'] += 1
-            if stop_data.get('visual_displays', False):
-                accessibility_stats['stops_with_visual'] += 1
+        accessibility_stats = {'stops_with_accessibility_data': len(accessibility_data)}
+        accessibility_stats.update(zip(_SUMMARY_FEATURES, counts.tolist()))
         
         return {
             'graph_statistics': graph_stats,
             'accessibility_statistics': accessibility_stats,
             'data_coverage': {
-                'accessibility_coverage': len(accessibility_data) / graph.number_of_nodes() * 100 if graph.number_of_nodes() > 0 else 0
+                'accessibility_coverage': len(accessibility_data) / num_stops * 100 if num_stops > 0 else 0
             }
         }
-            
-            # Add edges with attributes
-            for _, row in df.iterrows():
-                from_stop = str(row['from_stop']).strip()
-                to_stop = str(row['to_stop']).strip()
-                
-                # Edge attributes
-                edge_attrs = {
-                    'travel_time': float(row['travel_time']),
-                    'route_id': str(row.get('route_id', 'unknown')),
-                    'wheelchair_accessible': self._parse_boolean(row.get('wheelchair_accessible', False)),
-                    'has_elevator': self._parse_boolean(row.get('has_elevator', False)),
-                    'has_stairs': self._parse_boolean(row.get('has_stairs', True)),
-                    'low_floor': self._parse_boolean(row.get('low_floor', False)),
-                    'wide_doors': self._parse_boolean(row.get('wide_doors', False))
-                }
-                
-                # Add additional attributes if present
-                for col in df.columns:
-                    if col not in ['from_stop', 'to_stop'] and col not in edge_attrs:
-                        edge_attrs[col] = row[col]
-                
-                graph.add_edge(from_stop, to_stop, **edge_attrs)
-            
-            print(f"Loaded transit network: {graph.number_of_nodes()} stops, {graph.number_of_edges()} connections")
-            return graph
-            
-        except Exception as e:
-            raise ValueError(f"Error loading CSV file {file_path}: {str(e)}")
-    
-    def load_accessibility_json(self, file_path: str) -> Dict:
-        """
-        Load accessibility metadata from JSON file
-        
-        Args:
-            file_path: Path to JSON file
-            
-        Returns:
-            Dictionary with accessibility data for stops
-        """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                accessibility_data = json.load(file)
-            
-            # Validate and normalize the data
-            normalized_data = {}
-            for stop_name, stop_data in accessibility_data.items():
-                normalized_data[str(stop_name).strip()] = self._normalize_accessibility_data(stop_data)
-            
-            print(f"Loaded accessibility data for {len(normalized_data)} stops")
-            return normalized_data
-            
-        except FileNotFoundError:
-            print(f"Warning: Accessibility file {file_path} not found. Using empty accessibility data.")
-            return {}
-        except Exception as e:
-            raise ValueError(f"Error loading accessibility JSON file {file_path}: {str(e)}")
-    
-    def load_transit_geojson(self, file_path: str) -> nx.Graph:
-        """
-        Load transit network from GeoJSON file
-        
-        Args:
-            file_path: Path to GeoJSON file
-            
-        Returns:
-            NetworkX Graph representing the transit network
-        """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                geo_data = geojson.load(file)
-            
-            graph = nx.Graph()
-            
-            # Process features
-            for feature in geo_data['features']:
-                if feature['geometry']['type'] == 'LineString':
-                    # Extract route information from properties
-                    props = feature['properties']
-                    route_id = props.get('route_id', 'unknown')
-                    
-                    # Extract coordinates (simplified - assumes stops are at endpoints)
-                    coords = feature['geometry']['coordinates']
-                    if len(coords) >= 2:
-                        from_stop = f"Stop_{coords[0][0]:.6f}_{coords[0][1]:.6f}"
-                        to_stop = f"Stop_{coords[-1][0]:.6f}_{coords[-1][1]:.6f}"
-                        
-                        # Calculate approximate travel time (simplified)
-                        travel_time = props.get('travel_time', 5)  # Default 5 minutes
-                        
-                        graph.add_edge(from_stop, to_stop, 
-                                     travel_time=travel_time,
-                                     route_id=route_id,
-                                     coordinates=coords)
-            
-            print(f"Loaded GeoJSON transit network: {graph.number_of_nodes()} stops, {graph.number_of_edges()} connections")
-            return graph
-            
-        except Exception as e:
-            raise ValueError(f"Error loading GeoJSON file {file_path}: {str(e)}")
-    
-    def load_gtfs_data(self, gtfs_folder: str) -> nx.Graph:
-        """
-        Load transit network from GTFS (General Transit Feed Specification) data
-        
-        Args:
-            gtfs_folder: Path to folder containing GTFS files
-            
-        Returns:
-            NetworkX Graph representing the transit network
-        """
-        try:
-            gtfs_path = Path(gtfs_folder)
-            
-            # Load required GTFS files
-            stops_df = pd.read_csv(gtfs_path / 'stops.txt')
-            stop_times_df = pd.read_csv(gtfs_path / 'stop_times.txt')
-            trips_df = pd.read_csv(gtfs_path / 'trips.txt')
-            routes_df = pd.read_csv(gtfs_path / 'routes.txt')
-            
-            # Merge data to create connections
-            merged_df = stop_times_df.merge(trips_df, on='trip_id')
-            merged_df = merged_df.merge(routes_df, on='route_id')
-            merged_df = merged_df.merge(stops_df, left_on='stop_id', right_on='stop_id')
-            
-            # Create graph
-            graph = nx.Graph()
@@ -12,7 +12,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent))
 
 from routing_engine import AccessibleRouter
-from data_loader import DataLoader
+from data_loader import DEFAULT_CACHE_DIR, DataLoader
 
 
 def main():
@@ -48,6 +48,8 @@ Examples:
                        help="Path to transit network CSV file")
     parser.add_argument("--accessibility-data", default="data/accessibility.json",
                        help="Path to accessibility metadata JSON file")
+    parser.add_argument("--no-cache", action="store_true",
+                       help=f"Always parse data files instead of using the cache in {DEFAULT_CACHE_DIR}")
     
     # Output options
     parser.add_argument("--verbose", "-v", action="store_true",
@@ -60,7 +62,7 @@ Examples:
     try:
         # Load data
         print("Loading transit network data...")
-        data_loader = DataLoader()
+        data_loader = DataLoader(cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
         transit_graph = data_loader.load_transit_csv(args.transit_data)
         accessibility_data = data_loader.load_accessibility_json(args.accessibility_data)
         
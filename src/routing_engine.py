@@ -4,9 +4,44 @@ Implements Dijkstra's algorithm with accessibility constraints
 """
 
 import networkx as nx
-from typing import List, Dict, Optional, Set, Tuple
+from typing import List, Dict, Optional, Set, Tuple, Union
 import heapq
-from accessibility import AccessibilityFilter
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from accessibility import EDGE_BITS, AccessibilityFilter, stop_feature_mask
+from data_loader import CSRGraph, DataLoader
+
+# Accessibility notes for every combination of segment note bits:
+# 1 wheelchair accessible, 2 elevator available, 4 no stairs
+_NOTE_WHEELCHAIR, _NOTE_ELEVATOR, _NOTE_NO_STAIRS = 1, 2, 4
+_SEGMENT_NOTES = tuple(
+    "; ".join(note for bit, note in enumerate(("Wheelchair accessible", "Elevator available", "No stairs"))
+              if code >> bit & 1)
+    for code in range(8)
+)
+
+# Most recently used route results kept by find_path / find_accessible_path
+_ROUTE_CACHE_SIZE = 10_000
+
+# Largest graph for which busy requirement sets get all-pairs distance and
+# predecessor tables, taking 12 bytes per pair of stops; see _all_pairs
+_ALL_PAIRS_MAX_STOPS = 1000
+
+# Most recently used all-pairs tables kept
+_ALL_PAIRS_MAX_TABLES = 4
+
+# Sources searched together in find_paths_batch; each one holds a
+# distance and a predecessor row over every stop
+_BATCH_SOURCES = 64
+
+# Smallest graph searched by the Numba kernels. Below it, importing Numba
+# and loading the kernels takes longer than SciPy or _bidirectional_dijkstra
+# take for a typical session of queries
+_JIT_MIN_STOPS = 5000
 
 
 class AccessibleRouter:
@@ -26,6 +61,42 @@ class AccessibleRouter:
         self.accessibility_data = accessibility_data
         self.accessibility_filter = AccessibilityFilter(accessibility_data)
         
+        # Guards the lazily built state below when queries run on several threads
+        self._lock = threading.Lock()
+        
+        # CSR view of the graph for compiled path searches, built on first use
+        self._csr: Optional[CSRGraph] = None
+        self._csr_rows: Optional[np.ndarray] = None
+        self._stop_masks: Optional[np.ndarray] = None
+        self._weights: Optional[np.ndarray] = None
+        self._weight_matrix = None
+        # True when searches run in the Numba kernel over CSR search graphs
+        self._jit_search = False
+        
+        # Per-edge segment details in CSR order, looked up by row * n + column key
+        self._edge_keys: Optional[np.ndarray] = None
+        self._edge_times: Optional[np.ndarray] = None
+        self._edge_routes: Optional[List] = None
+        self._edge_notes: Optional[np.ndarray] = None
+        # Feature bits shared by every stop and by every segment, see _restricts
+        self._common_stop_mask = 0
+        self._common_edge_mask = 0
+        # Note bits each stop lets through to the segments leaving it, in CSR order
+        self._stop_note_masks: Optional[np.ndarray] = None
+        
+        # Integer code of each route name seen by _count_transfers
+        self._route_codes: Dict[Optional[str], int] = {None: -1}
+        
+        # LRU cache of route results keyed by (start, end, requirements tuple or None)
+        self._route_cache: OrderedDict = OrderedDict()
+        
+        # Search graph for each requirement set queried so far, see _search_graph
+        self._search_graphs: Dict[frozenset, object] = {}
+        # LRU of all-pairs tables of small graphs per requirement set, and the
+        # sources searched per requirement set since its search graph was built
+        self._all_pairs_tables: OrderedDict = OrderedDict()
+        self._all_pairs_searches: Dict[frozenset, int] = {}
+        
     def find_path(self, start: str, end: str) -> Dict:
         """
         Find the shortest path between two stops (basic routing)
@@ -37,27 +108,16 @@ class AccessibleRouter:
         Returns:
             Dictionary with path details, time, and transfers
         """
+        return self._cached_route((start, end, None), self._find_path, start, end)
+    
+    def _find_path(self, start: str, end: str) -> Dict:
+        """Uncached find_path"""
         try:
-            path = nx.shortest_path(self.graph, start, end, weight='travel_time')
-            total_time = nx.shortest_path_length(self.graph, start, end, weight='travel_time')
-            
-            # Calculate transfers and route details
-            details = self._build_route_details(path)
-            transfers = self._count_transfers(details)
-            
-            return {
-                'path': path,
-                'total_time': total_time,
-                'transfers': transfers,
-                'details': details,
-                'accessible': False  # Basic routing doesn't guarantee accessibility
-            }
+            total_time, path = self._shortest_path(start, end)
+            return self._route_result(path, total_time)
             
         except nx.NetworkXNoPath:
-            return {
-                'path': None,
-                'message': f"No route found between {start} and {end}"
-            }
+            return self._no_route_result(start, end)
         except nx.NodeNotFound as e:
             return {
                 'path': None,
@@ -76,73 +136,575 @@ class AccessibleRouter:
         Returns:
             Dictionary with path details, time, transfers, and accessibility info
         """
+        return self._cached_route((start, end, tuple(requirements)), self._find_accessible_path,
+                                  start, end, requirements)
+    
+    def _find_accessible_path(self, start: str, end: str, requirements: List[str]) -> Dict:
+        """Uncached find_accessible_path"""
         try:
-            # Create filtered graph based on accessibility requirements
-            accessible_graph = self._create_accessible_graph(requirements)
-            
-            if start not in accessible_graph.nodes or end not in accessible_graph.nodes:
+            meets_requirements = self.accessibility_filter.compile_predicate(requirements)
+            if (start not in self.graph or end not in self.graph or
+                    not meets_requirements(start) or not meets_requirements(end)):
                 return {
                     'path': None,
                     'message': f"Start or end stop not accessible with requirements: {requirements}"
                 }
             
-            # Find path in filtered graph
-            path = nx.shortest_path(accessible_graph, start, end, weight='travel_time')
-            total_time = nx.shortest_path_length(accessible_graph, start, end, weight='travel_time')
-            
-            # Build detailed route information
-            details = self._build_route_details(path, include_accessibility=True)
-            transfers = self._count_transfers(details)
-            
-            return {
-                'path': path,
-                'total_time': total_time,
-                'transfers': transfers,
-                'details': details,
-                'accessible': True,
-                'requirements_met': requirements
-            }
+            # Find path through the stops and segments meeting the requirements
+            total_time, path = self._shortest_path(start, end, requirements)
+            return self._route_result(path, total_time, requirements)
             
         except nx.NetworkXNoPath:
-            return {
-                'path': None,
-                'message': f"No accessible route found between {start} and {end} with requirements: {requirements}"
-            }
+            return self._no_route_result(start, end, requirements)
         except nx.NodeNotFound as e:
             return {
                 'path': None,
                 'message': f"Stop not found: {str(e)}"
             }
     
-    def _create_accessible_graph(self, requirements: List[str]) -> nx.Graph:
+    def _cached_route(self, key: Tuple, find, *args) -> Dict:
         """
-        Create a filtered graph containing only accessible routes
+        Answer a route query from the LRU route cache, computing it on a miss
         
         Args:
-            requirements: List of accessibility requirements
+            key: (start, end, requirements tuple or None)
+            find: Uncached route method to call on a miss
+            *args: Arguments for find
+            
+        Returns:
+            A copy of the route result, so callers cannot alter the cached one
+        """
+        route_cache = self._route_cache
+        with self._lock:
+            result = route_cache.get(key)
+            if result is not None:
+                route_cache.move_to_end(key)
+        
+        if result is None:
+            result = find(*args)
+            with self._lock:
+                route_cache[key] = result
+                if len(route_cache) > _ROUTE_CACHE_SIZE:
+                    route_cache.popitem(last=False)
+        
+        return self._copy_result(result)
+    
+    @staticmethod
+    def _copy_result(result: Dict) -> Dict:
+        """
+        Copy a route result as deep as it nests
+        
+        Results hold lists of stops or requirements and a list of flat segment
+        dictionaries, whose values are all immutable, so copying those
+        containers is enough and much cheaper than copy.deepcopy.
+        """
+        copied = dict(result)
+        for field, value in copied.items():
+            if isinstance(value, list):
+                copied[field] = [dict(item) if isinstance(item, dict) else item for item in value]
+        return copied
+    
+    def find_paths_batch(self, sources: List[str], targets: List[str],
+                         requirements: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Find routes for many (start, end) pairs with one search per distinct start
+        
+        Args:
+            sources: Starting stop of each pair
+            targets: Destination stop of each pair
+            requirements: Accessibility requirements as for find_accessible_path;
+                None routes like find_path
+            
+        Returns:
+            List of result dictionaries, one per pair, as the single-pair methods return
+        """
+        csr = self._build_csr()
+        pairs = list(zip(sources, targets))
+        
+        if self._weight_matrix is None and not self._jit_search:
+            return [self._find_one(start, end, requirements) for start, end in pairs]
+        
+        # Pairs that need a search, grouped by start; the others fail fast in _find_one()
+        meets_requirements = (self.accessibility_filter.compile_predicate(requirements)
+                              if requirements is not None else None)
+        pairs_by_start: Dict[str, List[int]] = {}
+        results: List[Optional[Dict]] = [None] * len(pairs)
+        for k, (start, end) in enumerate(pairs):
+            if (start in csr.node_index and end in csr.node_index and
+                    (meets_requirements is None or (meets_requirements(start) and meets_requirements(end)))):
+                pairs_by_start.setdefault(start, []).append(k)
+            else:
+                results[k] = self._find_one(start, end, requirements)
+        
+        graph = self._search_graph(requirements)
+        starts = list(pairs_by_start)
+        for block in range(0, len(starts), _BATCH_SOURCES):
+            block_starts = starts[block:block + _BATCH_SOURCES]
+            dist, predecessors = self._search(requirements, graph,
+                                              [csr.node_index[start] for start in block_starts])
+            
+            for row, start in enumerate(block_starts):
+                src = csr.node_index[start]
+                for k in pairs_by_start[start]:
+                    end = pairs[k][1]
+                    dst = csr.node_index[end]
+                    if np.isinf(dist[row, dst]):
+                        results[k] = self._no_route_result(start, end, requirements)
+                    else:
+                        path = self._predecessor_path(predecessors[row], src, dst)
+                        results[k] = self._route_result(path, float(dist[row, dst]), requirements)
+        
+        return results
+    
+    def find_paths_concurrent(self, queries: List[Tuple], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Answer independent route queries on a thread pool
+        
+        Do not call update_accessibility while the queries are running.
+        
+        Args:
+            queries: (start, end) or (start, end, requirements) tuples; requirements
+                are as for find_accessible_path, None or missing routes like find_path
+            max_workers: Number of threads, ThreadPoolExecutor's default if None
+            
+        Returns:
+            List of result dictionaries in query order
+        """
+        # Build shared state up front rather than racing for it in the workers
+        self._build_csr()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda query: self._find_one(*query), queries))
+    
+    def _find_one(self, start: str, end: str, requirements: Optional[List[str]] = None) -> Dict:
+        """Route one pair with find_path, or find_accessible_path when requirements are given"""
+        if requirements is None:
+            return self.find_path(start, end)
+        return self.find_accessible_path(start, end, requirements)
+    
+    def _route_result(self, path: List[str], total_time: float,
+                      requirements: Optional[List[str]] = None) -> Dict:
+        """
+        Build the result dictionary for a found route
+        
+        Args:
+            path: List of stops in the route
+            total_time: Total travel time of the route
+            requirements: Accessibility requirements the route meets; None for basic routing
+            
+        Returns:
+            Dictionary with path details, time, and transfers
+        """
+        details = self._build_route_details(path, include_accessibility=requirements is not None)
+        result = {
+            'path': path,
+            'total_time': total_time,
+            'transfers': self._count_transfers(details),
+            'details': details,
+            'accessible': requirements is not None  # Basic routing doesn't guarantee accessibility
+        }
+        if requirements is not None:
+            result['requirements_met'] = list(requirements)
+        return result
+    
+    def _no_route_result(self, start: str, end: str,
+                         requirements: Optional[List[str]] = None) -> Dict:
+        """
+        Build the result dictionary for a pair with no route
+        
+        Args:
+            start: Starting stop name
+            end: Destination stop name
+            requirements: Accessibility requirements searched with; None for basic routing
+            
+        Returns:
+            Dictionary with an empty path and the reason
+        """
+        if requirements is None:
+            message = f"No route found between {start} and {end}"
+        else:
+            message = f"No accessible route found between {start} and {end} with requirements: {requirements}"
+        return {'path': None, 'message': message}
+    
+    def _shortest_path(self, start: str, end: str,
+                       requirements: Optional[List[str]] = None) -> Tuple[float, List[str]]:
+        """
+        Find the shortest path by travel time, optionally restricted to accessible segments
+        
+        Args:
+            start: Starting stop name
+            end: Destination stop name
+            requirements: Accessibility requirements every stop and segment must meet
+            
+        Returns:
+            Tuple of (total travel time, list of stops)
+            
+        Raises:
+            nx.NodeNotFound: If start or end is not in the graph
+            nx.NetworkXNoPath: If end cannot be reached from start
+        """
+        if start not in self.graph:
+            raise nx.NodeNotFound(f"Source {start} is not in G")
+        if end not in self.graph:
+            raise nx.NodeNotFound(f"Target {end} is not in G")
+        
+        csr = self._build_csr()
+        src = csr.node_index[start]
+        dst = csr.node_index[end]
+        graph = self._search_graph(requirements)
+        
+        if self._jit_search or self._weight_matrix is not None:
+            dist, predecessors = self._search(requirements, graph, src, dst)
+        else:
+            total_time, path = self._bidirectional_dijkstra(graph, src, dst)
+            nodes = csr.nodes
+            return total_time, [nodes[i] for i in path]
+        
+        if np.isinf(dist[dst]):
+            raise nx.NetworkXNoPath(f"Node {end} not reachable from {start}")
+        
+        return float(dist[dst]), self._predecessor_path(predecessors, src, dst)
+    
+    def _search(self, requirements: Optional[List[str]], graph, sources: Union[int, List[int]],
+                dst: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run compiled shortest-path searches from several stops
+        
+        Single-pair and batch queries both search through here, so routes
+        with equal travel times are chosen the same way by either.
+        
+        Args:
+            requirements: List of accessibility requirements; None or empty for no restriction
+            graph: The _search_graph of the requirements
+            sources: Index of the starting stop, or a list of them
+            dst: Index of a stop the searches may stop at once it is settled, -1 for none
             
         Returns:
-            Filtered NetworkX graph
+            Tuple of (distance, predecessor) arrays for a single source, or
+            matrices with one row per source for a list
         """
-        accessible_graph = self.graph.copy()
+        single = isinstance(sources, int)
+        tables = self._all_pairs(requirements, graph, 1 if single else len(sources))
+        if tables is not None:
+            dist, predecessors = tables
+            return dist[sources], predecessors[sources]
         
-        # Remove inaccessible nodes
-        nodes_to_remove = []
-        for node in accessible_graph.nodes():
-            if not self.accessibility_filter.meets_requirements(node, requirements):
-                nodes_to_remove.append(node)
+        if not self._jit_search:
+            from scipy.sparse.csgraph import dijkstra
+            
+            return dijkstra(graph, indices=sources, return_predecessors=True)
         
-        accessible_graph.remove_nodes_from(nodes_to_remove)
+        from _accel import dijkstra_csr
         
-        # Remove inaccessible edges
-        edges_to_remove = []
-        for u, v, data in accessible_graph.edges(data=True):
-            if not self.accessibility_filter.edge_meets_requirements(u, v, data, requirements):
-                edges_to_remove.append((u, v))
+        indptr, indices, weights = (graph.indptr, graph.indices, graph.data) if self._weight_matrix is not None else graph
+        if single:
+            return dijkstra_csr(indptr, indices, weights, sources, dst)
+        rows = [dijkstra_csr(indptr, indices, weights, src, dst) for src in sources]
+        return np.array([dist for dist, _ in rows]), np.array([predecessors for _, predecessors in rows])
+    
+    def _predecessor_path(self, predecessors: np.ndarray, src: int, dst: int) -> List[str]:
+        """
+        Walk a predecessor array back from the destination
         
-        accessible_graph.remove_edges_from(edges_to_remove)
+        Args:
+            predecessors: Predecessor of each stop index in a search from src
+            src: Index of the starting stop
+            dst: Index of the destination stop, reachable from src
+            
+        Returns:
+            List of stop names from start to destination
+        """
+        path = [dst]
+        while path[-1] != src:
+            path.append(predecessors[path[-1]])
         
-        return accessible_graph
+        nodes = self._csr.nodes
+        return [nodes[i] for i in reversed(path)]
+    
+    def _all_pairs(self, requirements: Optional[List[str]], graph,
+                   searches: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get shortest-path distances and predecessors between all stops for a requirement set
+        
+        Tables are only built for graphs of at most _ALL_PAIRS_MAX_STOPS stops,
+        once the requirement set has been searched from more sources than there
+        are stops since update_accessibility last dropped its search graph. By
+        then the searches have cost about as much as the tables, and a stream
+        of updates keeps using single-source searches.
+        
+        Args:
+            requirements: List of accessibility requirements; None or empty for no restriction
+            graph: The _search_graph of the requirements
+            searches: Number of sources about to be searched
+            
+        Returns:
+            Tuple of (distance, predecessor) matrices whose row i holds the
+            result of a search from stop i, or None to search from the sources
+        """
+        num_stops = len(self._csr.nodes)
+        if num_stops > _ALL_PAIRS_MAX_STOPS:
+            return None
+        
+        key = frozenset(requirements or ())
+        with self._lock:
+            tables = self._all_pairs_tables.get(key)
+            if tables is not None:
+                self._all_pairs_tables.move_to_end(key)
+                return tables
+            searched = self._all_pairs_searches.get(key, 0) + searches
+            self._all_pairs_searches[key] = searched
+        if searched <= num_stops:
+            return None
+        
+        unrestricted = self._all_pairs_tables.get(frozenset())
+        if key and unrestricted is not None and graph is self._search_graphs.get(frozenset()):
+            # Requirements that restrict nothing share the unrestricted tables too
+            tables = unrestricted
+        elif self._jit_search:
+            from _accel import all_pairs_dijkstra
+            
+            indptr, indices, weights = (graph.indptr, graph.indices, graph.data) if self._weight_matrix is not None else graph
+            tables = all_pairs_dijkstra(indptr, indices, weights)
+        else:
+            from scipy.sparse.csgraph import dijkstra
+            
+            tables = dijkstra(graph, return_predecessors=True)
+        
+        with self._lock:
+            tables = self._all_pairs_tables.setdefault(key, tables)
+            if len(self._all_pairs_tables) > _ALL_PAIRS_MAX_TABLES:
+                self._all_pairs_tables.popitem(last=False)
+            return tables
+    
+    def _bidirectional_dijkstra(self, adjacency: List[List[Tuple[int, float]]],
+                                src: int, dst: int) -> Tuple[float, List[int]]:
+        """
+        Dijkstra search growing from both ends until the two frontiers meet
+        
+        Used when neither Numba nor SciPy is available. Stops are integer CSR
+        indices, so the heaps and dictionaries never hash or compare stop
+        names. The graph is undirected, so both searches use the same
+        adjacency lists.
+        
+        Args:
+            adjacency: (neighbor index, travel time) pairs of every stop, see _search_graph
+            src: Index of the starting stop
+            dst: Index of the destination stop
+            
+        Returns:
+            Tuple of (total travel time, list of stop indices)
+            
+        Raises:
+            nx.NetworkXNoPath: If dst cannot be reached from src
+        """
+        if src == dst:
+            return 0.0, [src]
+        
+        # Index 0 holds the search from src, index 1 the search from dst
+        settled = ({}, {})
+        seen = ({src: 0.0}, {dst: 0.0})
+        pred = ({src: -1}, {dst: -1})
+        heaps = ([(0.0, src)], [(0.0, dst)])
+        best = float('inf')
+        meeting = None
+        
+        while heaps[0] and heaps[1]:
+            # No path through the unsettled stops can beat best any more
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            
+            # Grow the side whose frontier is closer to its end
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side][u] = d
+            
+            own_seen, other_seen = seen[side], seen[1 - side]
+            for v, weight in adjacency[u]:
+                vd = d + weight
+                if v not in settled[side] and (v not in own_seen or vd < own_seen[v]):
+                    own_seen[v] = vd
+                    pred[side][v] = u
+                    heapq.heappush(heaps[side], (vd, v))
+                if v in other_seen and vd + other_seen[v] < best:
+                    best = vd + other_seen[v]
+                    meeting = (side, u, v)
+        
+        if meeting is None:
+            nodes = self._csr.nodes
+            raise nx.NetworkXNoPath(f"Node {nodes[dst]} not reachable from {nodes[src]}")
+        
+        # Join the two halves across the edge where the searches met
+        side, u, v = meeting
+        halves = ([], [])
+        for half, stop, tree in ((halves[side], u, pred[side]), (halves[1 - side], v, pred[1 - side])):
+            while stop >= 0:
+                half.append(stop)
+                stop = tree[stop]
+        
+        return best, halves[0][::-1] + halves[1]
+    
+    def _build_csr(self) -> CSRGraph:
+        """
+        Build the CSR arrays and SciPy weight matrix of the graph once
+        
+        The weight matrix stays None, and the Numba search off, when the graph
+        has negative travel times, which neither Dijkstra handles. The weight
+        matrix also needs SciPy, and the Numba search needs Numba and a graph
+        of at least _JIT_MIN_STOPS stops.
+        
+        Returns:
+            CSRGraph of the transit graph
+        """
+        if self._csr is not None:
+            return self._csr
+        
+        with self._lock:
+            if self._csr is not None:
+                return self._csr
+            
+            csr = DataLoader().to_csr(self.graph)
+            
+            # NetworkX counts a segment without travel_time as weight 1
+            weights = np.where(np.isnan(csr.travel_time), 1.0, csr.travel_time)
+            
+            self._csr_rows = np.repeat(np.arange(len(csr.nodes), dtype=np.int32), np.diff(csr.indptr))
+            # Packed feature mask of every stop in CSR order, kept current by update_accessibility
+            self._stop_masks = self.accessibility_filter.stop_mask_array(csr.nodes)
+            self._common_stop_mask = int(np.bitwise_and.reduce(self._stop_masks))
+            self._common_edge_mask = int(np.bitwise_and.reduce(csr.edge_mask))
+            self._weights = weights
+            if not (weights < 0).any():
+                if len(csr.nodes) >= _JIT_MIN_STOPS:
+                    from _accel import njit
+                    
+                    self._jit_search = njit is not None
+                try:
+                    from scipy.sparse import csr_matrix
+                except ImportError:
+                    # SciPy is optional; without it paths are searched by the Numba
+                    # kernel or _bidirectional_dijkstra
+                    pass
+                else:
+                    self._weight_matrix = csr_matrix((weights, csr.indices, csr.indptr),
+                                                     shape=(len(csr.nodes), len(csr.nodes)))
+            
+            # Columns are sorted within each row, so these keys are sorted overall
+            self._edge_keys = self._csr_rows.astype(np.int64) * len(csr.nodes) + csr.indices
+            self._edge_times = np.where(np.isnan(csr.travel_time), 0, csr.travel_time)
+            adj = self.graph._adj
+            nodes = csr.nodes
+            self._edge_routes = [adj[nodes[u]][nodes[v]].get('route_id', 'Unknown')
+                                 for u, v in zip(self._csr_rows.tolist(), csr.indices.tolist())]
+            
+            # Note bits of each edge; the elevator one is checked against the stop per query
+            mask = csr.edge_mask
+            self._edge_notes = (
+                np.where(mask & np.uint64(EDGE_BITS['wheelchair_accessible']), _NOTE_WHEELCHAIR, 0) |
+                np.where(mask & np.uint64(EDGE_BITS['has_elevator']), _NOTE_ELEVATOR, 0) |
+                np.where(mask & np.uint64(EDGE_BITS['has_stairs']), 0, _NOTE_NO_STAIRS)
+            ).astype(np.uint8)
+            accessibility_data = self.accessibility_data
+            self._stop_note_masks = np.fromiter(
+                (self._stop_note_mask(accessibility_data.get(stop, {})) for stop in nodes),
+                dtype=np.uint8, count=len(nodes))
+            
+            # Set last, so a thread seeing _csr also sees the arrays above
+            self._csr = csr
+            return csr
+    
+    def _search_graph(self, requirements: Optional[List[str]]):
+        """
+        Get the graph searched for a requirement set, restricted to segments meeting it
+        
+        The result is cached per requirement set until update_accessibility
+        changes whether some stop meets it.
+        
+        Args:
+            requirements: List of accessibility requirements; None or empty for no restriction
+            
+        Returns:
+            SciPy CSR weight matrix; without SciPy, (indptr, indices, weights)
+            arrays for the Numba search or else a list of (neighbor index,
+            travel time) pairs per stop index
+        """
+        key = frozenset(requirements or ())
+        graph = self._search_graphs.get(key)
+        if graph is not None:
+            return graph
+        
+        if not key:
+            graph = self._build_search_graph(None)
+        elif self._restricts(requirements):
+            graph = self._build_search_graph(requirements)
+        else:
+            # Every stop and segment meets these requirements, so share the unrestricted graph
+            graph = self._search_graph(None)
+        
+        # Another thread may have built the same graph meanwhile; keep one
+        with self._lock:
+            return self._search_graphs.setdefault(key, graph)
+    
+    def _build_search_graph(self, requirements: Optional[List[str]]):
+        """Build the uncached _search_graph for a requirement set, None for no restriction"""
+        csr = self._csr
+        keep = self._accessible_edges(requirements) if requirements else np.ones(len(csr.indices), dtype=bool)
+        rows = self._csr_rows[keep]
+        
+        if self._weight_matrix is None and not self._jit_search:
+            graph = [[] for _ in csr.nodes]
+            for u, v, weight in zip(rows.tolist(), csr.indices[keep].tolist(), self._weights[keep].tolist()):
+                graph[u].append((v, weight))
+            return graph
+        
+        if not requirements:
+            return self._weight_matrix if self._weight_matrix is not None else (csr.indptr, csr.indices, self._weights)
+        
+        indptr = np.zeros_like(csr.indptr)
+        np.cumsum(np.bincount(rows, minlength=len(csr.nodes)), out=indptr[1:])
+        indices, weights = csr.indices[keep], self._weights[keep]
+        if self._weight_matrix is not None:
+            from scipy.sparse import csr_matrix
+            
+            return csr_matrix((weights, indices, indptr), shape=(len(csr.nodes), len(csr.nodes)))
+        return indptr, indices, weights
+    
+    def _restricts(self, requirements: List[str]) -> bool:
+        """
+        Check whether some stop or segment fails accessibility requirements
+        
+        Args:
+            requirements: List of accessibility requirements
+            
+        Returns:
+            False when every stop and every segment meets them
+        """
+        required, edge_required = self.accessibility_filter.compile_requirements(requirements)
+        return ((self._common_stop_mask & required) != required or
+                (self._common_edge_mask & edge_required) != edge_required)
+    
+    def _accessible_edges(self, requirements: List[str]) -> np.ndarray:
+        """
+        Check every CSR edge against accessibility requirements
+        
+        Args:
+            requirements: List of accessibility requirements
+            
+        Returns:
+            Boolean array in CSR order, True where both stops and the segment meet them
+        """
+        csr = self._csr
+        required, edge_required = map(np.uint64, self.accessibility_filter.compile_requirements(requirements))
+        from_masks, to_masks = self._stop_masks[self._csr_rows], self._stop_masks[csr.indices]
+        if not self._jit_search:
+            # The NumPy form of edges_ok, sparing graphs below _JIT_MIN_STOPS the Numba import
+            return (((from_masks & required) == required) & ((to_masks & required) == required) &
+                    ((csr.edge_mask & edge_required) == edge_required))
+        
+        from _accel import edges_ok
+        
+        return edges_ok(from_masks, to_masks, csr.edge_mask, required, edge_required)
     
     def _build_route_details(self, path: List[str], include_accessibility: bool = False) -> List[Dict]:
         """
@@ -155,40 +717,37 @@ class AccessibleRouter:
         Returns:
             List of route segment details
         """
-        details = []
+        csr = self._build_csr()
         
-        for i in range(len(path) - 1):
-            from_stop = path[i]
-            to_stop = path[i + 1]
-            
-            # Get edge data
-            edge_data = self.graph.get_edge_data(from_stop, to_stop, {})
-            
+        # CSR position of every segment on the path, found with one sorted search
+        ids = np.fromiter((csr.node_index[stop] for stop in path), dtype=np.int64, count=len(path))
+        edges = np.searchsorted(self._edge_keys, ids[:-1] * len(csr.nodes) + ids[1:])
+        routes = self._edge_routes
+        # An elevator only counts while it works at the stop the segment leaves
+        segment_notes = self._edge_notes[edges] & self._stop_note_masks[ids[:-1]]
+        
+        details = []
+        for from_stop, to_stop, edge, time, notes in zip(path, path[1:], edges.tolist(),
+                                                         self._edge_times[edges].tolist(), segment_notes.tolist()):
             segment = {
                 'from': from_stop,
                 'to': to_stop,
-                'route': edge_data.get('route_id', 'Unknown'),
-                'time': edge_data.get('travel_time', 0)
+                'route': routes[edge],
+                'time': time
             }
             
-            if include_accessibility:
-                # Add accessibility information
-                accessibility_notes = []
-                
-                if edge_data.get('wheelchair_accessible'):
-                    accessibility_notes.append("Wheelchair accessible")
-                if edge_data.get('has_elevator') and self.accessibility_data.get(from_stop, {}).get('elevator_working', True):
-                    accessibility_notes.append("Elevator available")
-                if not edge_data.get('has_stairs', True):
-                    accessibility_notes.append("No stairs")
-                
-                if accessibility_notes:
-                    segment['accessibility_notes'] = "; ".join(accessibility_notes)
+            if include_accessibility and notes:
+                segment['accessibility_notes'] = _SEGMENT_NOTES[notes]
             
             details.append(segment)
         
         return details
     
+    @staticmethod
+    def _stop_note_mask(stop_data: Dict) -> int:
+        """Note bits kept on segments leaving a stop: all but the elevator one while it is out of service"""
+        return 0xFF if stop_data.get('elevator_working', True) else 0xFF & ~_NOTE_ELEVATOR
+    
     def _count_transfers(self, details: List[Dict]) -> int:
         """
         Count the number of transfers required for a route
@@ -202,16 +761,21 @@ class AccessibleRouter:
         if len(details) <= 1:
             return 0
         
-        transfers = 0
-        current_route = None
+        # Compare small integer route codes instead of route names
+        route_codes = self._route_codes
+        codes = np.fromiter(
+            (route_codes[route] if route in route_codes else self._new_route_code(route)
+             for route in (segment['route'] for segment in details)),
+            dtype=np.int32, count=len(details)
+        )
         
-        for segment in details:
-            route = segment['route']
-            if current_route is not None and route != current_route:
-                transfers += 1
-            current_route = route
-        
-        return transfers
+        # A change of route is a transfer, unless the previous segment had no route
+        return int(np.count_nonzero((codes[1:] != codes[:-1]) & (codes[:-1] >= 0)))
+    
+    def _new_route_code(self, route: str) -> int:
+        """Assign the next route code; locked so two threads never share one"""
+        with self._lock:
+            return self._route_codes.setdefault(route, len(self._route_codes))
     
     def update_accessibility(self, stop: str, **accessibility_updates):
         """
@@ -224,10 +788,36 @@ class AccessibleRouter:
         if stop not in self.accessibility_data:
             self.accessibility_data[stop] = {}
         
+        old_mask = int(self.accessibility_filter.stop_mask_array([stop])[0])
         self.accessibility_data[stop].update(accessibility_updates)
+        new_mask = stop_feature_mask(self.accessibility_data[stop])
+        
+        # Update the accessibility filter in place
+        self.accessibility_filter.invalidate(stop)
+        if self._csr is not None and stop in self._csr.node_index:
+            idx = self._csr.node_index[stop]
+            self._stop_masks[idx] = new_mask
+            self._common_stop_mask = int(np.bitwise_and.reduce(self._stop_masks))
+            self._stop_note_masks[idx] = self._stop_note_mask(self.accessibility_data[stop])
         
-        # Update the accessibility filter
-        self.accessibility_filter = AccessibilityFilter(self.accessibility_data)
+        def status_changed(requirements) -> bool:
+            required, _ = self.accessibility_filter.compile_requirements(requirements)
+            return (old_mask & required == required) != (new_mask & required == required)
+        
+        # Only requirement sets the stop now meets or fails differently are stale
+        for key in list(self._search_graphs):
+            if status_changed(sorted(key)):
+                del self._search_graphs[key]
+                with self._lock:
+                    self._all_pairs_tables.pop(key, None)
+                    self._all_pairs_searches.pop(key, None)
+        
+        # Accessible routes also go stale when they pass the stop, whose data
+        # feeds their notes; basic routes never read accessibility data
+        with self._lock:
+            for key, result in list(self._route_cache.items()):
+                if key[2] is not None and (status_changed(key[2]) or stop in (result['path'] or ())):
+                    del self._route_cache[key]
     
     def get_accessibility_info(self, stop: str) -> Dict:
         """
@@ -251,10 +841,9 @@ class AccessibleRouter:
         Returns:
             List of accessible stop names
         """
-        accessible_stops = []
-        
-        for stop in self.graph.nodes():
-            if self.accessibility_filter.meets_requirements(stop, requirements):
-                accessible_stops.append(stop)
+        csr = self._build_csr()
+        required = np.uint64(self.accessibility_filter.compile_requirements(requirements)[0])
         
-        return accessible_stops
+        # One vectorized mask test over every stop, in graph node order
+        accessible = (self._stop_masks & required) == required
+        return [csr.nodes[i] for i in np.flatnonzero(accessible)]
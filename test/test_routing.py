@@ -74,3 +74,669 @@ class TestDataLoader(unittest.TestCase):
         self.assertTrue(self.data_loader._parse_boolean(True))
         self.assertTrue(self.data_loader._parse_boolean('true'))
         self
+
+    
+    def test_vectorize_booleans(self):
+        """Test column-wise boolean parsing"""
+        import pandas as pd
+        df = pd.DataFrame({
+            'text': ['true', 'No', 'Y', None],
+            'numeric': [1.0, 0.0, None, 2.0],
+            'padded': [' true', 'YES ', ' 0 ', 'f']
+        })
+        self.data_loader._vectorize_booleans(df, {'text': False, 'numeric': False, 'padded': False, 'has_stairs': True})
+        self.assertEqual(df['text'].tolist(), [True, False, True, False])
+        self.assertEqual(df['numeric'].tolist(), [True, False, False, True])
+        self.assertEqual(df['padded'].tolist(), [True, True, False, False])
+        self.assertEqual(df['has_stairs'].tolist(), [True, True, True, True])
+    
+    def test_parse_gtfs_time_column(self):
+        """Test column-wise GTFS time parsing matches the scalar parser"""
+        import pandas as pd
+        times = ['08:00:00', '25:10:05', '8:5:3', 'bad', None]
+        parsed = self.data_loader._parse_gtfs_time_column(pd.Series(times))
+        
+        self.assertEqual(parsed.tolist(), [28800, 90605, 29103, 0, 0])
+        self.assertEqual(parsed.tolist(), [self.data_loader._parse_gtfs_time(t) for t in times])
+    
+    def test_to_csr(self):
+        """Test CSR conversion stores both directions of every edge"""
+        graph = nx.Graph()
+        graph.add_edge('A', 'C', travel_time=2.0, wheelchair_accessible=True)
+        graph.add_edge('A', 'B', travel_time=1.5)
+        csr = self.data_loader.to_csr(graph)
+        
+        self.assertEqual(csr.nodes, ['A', 'C', 'B'])
+        self.assertEqual(csr.indptr.tolist(), [0, 2, 3, 4])
+        self.assertEqual(csr.indices.tolist(), [1, 2, 0, 0])
+        self.assertEqual(csr.travel_time.tolist(), [2.0, 1.5, 2.0, 1.5])
+        self.assertEqual(csr.edge_mask[0], csr.edge_mask[2])
+        self.assertIsNone(self.data_loader.to_csr(graph, attributes=False).travel_time)
+    
+    def test_validate_data_consistency(self):
+        """Test component counting and non-positive travel time detection"""
+        graph = nx.Graph()
+        graph.add_edge('A', 'B', travel_time=2.0)
+        graph.add_edge('C', 'D', travel_time=0)
+        graph.add_edge('D', 'E')
+        results = self.data_loader.validate_data_consistency(graph, {stop: {} for stop in graph})
+        
+        self.assertFalse(results['valid'])
+        self.assertEqual(results['warnings'], ["Network has 2 disconnected components"])
+        self.assertEqual(results['errors'], ["Edges with non-positive travel times: [('C', 'D'), ('D', 'E')]"])
+        
+        # Edits in place are seen by the next validation
+        graph['C']['D']['travel_time'] = 1.0
+        graph['D']['E']['travel_time'] = 1.0
+        self.assertEqual(self.data_loader.validate_data_consistency(graph, {})['errors'], [])
+    
+    def test_validate_reuses_csr_structure(self):
+        """Test validation reuses the CSR structure until the graph changes"""
+        from _accel import njit
+        
+        graph = nx.Graph([('A', 'B'), ('C', 'D')])
+        accessibility_data = {stop: {} for stop in 'ABCD'}
+        self.data_loader.validate_data_consistency(graph, accessibility_data)
+        csr = self.data_loader._csr_cache
+        # The structure only backs the compiled component count
+        self.assertEqual(csr is None, njit is None)
+        self.data_loader.validate_data_consistency(graph, accessibility_data)
+        self.assertIs(self.data_loader._csr_cache, csr)
+        
+        graph.add_edge('B', 'C')
+        self.assertEqual(self.data_loader.validate_data_consistency(graph, accessibility_data)['warnings'], [])
+        
+        # Replacing a segment keeps the counts, so it needs an explicit invalidation
+        graph.remove_edge('B', 'C')
+        graph.add_edge('A', 'C')
+        self.data_loader.invalidate_summary()
+        self.assertEqual(self.data_loader.validate_data_consistency(graph, accessibility_data)['warnings'], [])
+        if njit is not None:
+            self.assertIsNot(self.data_loader._csr_cache, csr)
+    
+    def test_validate_stop_coverage(self):
+        """Test stops missing from either the graph or the accessibility data"""
+        graph = nx.Graph()
+        graph.add_edge('A', 'B', travel_time=2.0)
+        graph.add_edge('B', 'C', travel_time=1.0)
+        results = self.data_loader.validate_data_consistency(graph, {'B': {}, 'X': {}})
+        
+        self.assertTrue(results['valid'])
+        self.assertEqual(results['warnings'], [
+            "Stops without accessibility data: ['A', 'C']",
+            "Accessibility data for non-existent stops: ['X']"
+        ])
+    
+    def test_data_summary_cache(self):
+        """Test the data summary is cached until its inputs change"""
+        graph = nx.Graph()
+        graph.add_edge('A', 'B', travel_time=2.0, route_id='R1')
+        accessibility_data = {'A': {'wheelchair_accessible': True, 'has_ramp': True}}
+        summary = self.data_loader.get_data_summary(graph, accessibility_data)
+        
+        self.assertEqual(summary['accessibility_statistics']['wheelchair_accessible_stops'], 1)
+        self.assertEqual(summary['accessibility_statistics']['stops_with_ramps'], 1)
+        self.assertEqual(summary['graph_statistics']['avg_travel_time'], 2.0)
+        
+        self.assertEqual(self.data_loader.get_data_summary(graph, accessibility_data), summary)
+        
+        # Changing the returned copy leaves the cached summary intact
+        summary['graph_statistics']['avg_travel_time'] = 0
+        self.assertEqual(self.data_loader.get_data_summary(graph, accessibility_data)
+                         ['graph_statistics']['avg_travel_time'], 2.0)
+        
+        # Added stops and segments are picked up
+        accessibility_data['B'] = {'wheelchair_accessible': True}
+        graph.add_edge('B', 'C', travel_time=4.0)
+        summary = self.data_loader.get_data_summary(graph, accessibility_data)
+        self.assertEqual(summary['accessibility_statistics']['wheelchair_accessible_stops'], 2)
+        self.assertEqual(summary['graph_statistics']['avg_travel_time'], 3.0)
+        
+        # Edits in place need invalidate_summary
+        accessibility_data['A']['has_ramp'] = False
+        graph['B']['C']['travel_time'] = 2.0
+        self.data_loader.invalidate_summary()
+        summary = self.data_loader.get_data_summary(graph, accessibility_data)
+        self.assertEqual(summary['accessibility_statistics']['stops_with_ramps'], 0)
+        self.assertEqual(summary['graph_statistics']['avg_travel_time'], 2.0)
+    
+    def test_data_summary_edge_statistics(self):
+        """Test travel time and route statistics, including missing attributes"""
+        graph = nx.Graph()
+        graph.add_edge('A', 'B', travel_time=4.0, route_id='R1')
+        graph.add_edge('B', 'C', travel_time=2.0, route_id='R2')
+        graph.add_edge('C', 'D')
+        stats = self.data_loader.get_data_summary(graph, {})['graph_statistics']
+        
+        self.assertEqual(stats['unique_routes'], 3)
+        self.assertEqual(stats['avg_travel_time'], 2.0)
+        self.assertEqual(stats['min_travel_time'], 0)
+        self.assertEqual(stats['max_travel_time'], 4.0)
+        self.assertEqual(stats['average_degree'], 1.5)
+    
+    def test_data_summary_components(self):
+        """Test connectivity is derived from a single component count"""
+        graph = nx.Graph()
+        stats = self.data_loader.get_data_summary(graph, {})['graph_statistics']
+        self.assertFalse(stats['is_connected'])
+        self.assertEqual(stats['number_of_components'], 0)
+        
+        graph = nx.Graph([('A', 'B'), ('C', 'D')])
+        stats = self.data_loader.get_data_summary(graph, {})['graph_statistics']
+        self.assertFalse(stats['is_connected'])
+        self.assertEqual(stats['number_of_components'], 2)
+    
+    def test_data_summary_accessibility_counts(self):
+        """Test accessibility counters from packed masks match per-stop counts"""
+        try:
+            accessibility_data = self.data_loader.load_accessibility_json(
+                self.test_data_path / 'accessibility.json'
+            )
+        except ValueError:
+            self.skipTest("Accessibility data file not found")
+        
+        # Loaded dictionaries hold only the stop's own fields
+        self.assertFalse(any(key.startswith('_') for data in accessibility_data.values() for key in data))
+        graph = nx.Graph()
+        graph.add_nodes_from(accessibility_data)
+        
+        stats = self.data_loader.get_data_summary(graph, accessibility_data)['accessibility_statistics']
+        self.assertEqual(stats['stops_with_elevators'],
+                         sum(bool(d.get('has_elevator')) for d in accessibility_data.values()))
+        self.assertEqual(stats['stops_with_audio'],
+                         sum(bool(d.get('audio_announcements')) for d in accessibility_data.values()))
+    
+    def test_load_transit_csv_extra_columns(self):
+        """Test additional CSV columns are kept as edge attributes"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'transit.csv'
+            file_path.write_text(
+                "from_stop,to_stop,travel_time,platform,wheelchair_accessible\n"
+                " A ,B,2,north,yes\n"
+                "B,C,3,south,no\n"
+            )
+            graph = self.data_loader.load_transit_csv(file_path)
+        
+        edge_data = graph.get_edge_data('A', 'B')
+        self.assertEqual(edge_data['platform'], 'north')
+        self.assertEqual(edge_data['route_id'], 'unknown')
+        self.assertTrue(edge_data['wheelchair_accessible'])
+        self.assertTrue(edge_data['has_stairs'])
+        self.assertEqual(list(edge_data)[-1], 'platform')
+    
+    def test_load_transit_geojson_parsers_agree(self):
+        """Test the streaming and whole-file GeoJSON parsers build the same graph"""
+        import json
+        import tempfile
+        from unittest import mock
+        import data_loader
+        if data_loader.ijson is None:
+            self.skipTest("ijson not installed")
+        
+        features = [
+            {'type': 'Feature', 'properties': {'route_id': 'R1', 'travel_time': 2.5},
+             'geometry': {'type': 'LineString', 'coordinates': [[-79.38, 43.645], [-79.391234, 43.65]]}},
+            {'type': 'Feature', 'properties': {},
+             'geometry': {'type': 'Point', 'coordinates': [-79.38, 43.645]}}
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'network.geojson'
+            file_path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+            streamed = self.data_loader.load_transit_geojson(file_path)
+            with mock.patch('data_loader.ijson', None):
+                parsed = self.data_loader.load_transit_geojson(file_path)
+        
+        self.assertEqual(list(streamed.edges(data=True)), list(parsed.edges(data=True)))
+        self.assertEqual(streamed.number_of_edges(), 1)
+    
+    def test_load_gtfs_data(self):
+        """Test GTFS stop times become edges between consecutive stops of each trip"""
+        import tempfile
+        files = {
+            'stops.txt': "stop_id,stop_name,stop_lat\nS1,Alpha,0\nS2,Beta,0\nS3,Gamma,0\n",
+            'routes.txt': "route_id,route_short_name,route_type\nR1,10,3\n",
+            'trips.txt': "route_id,trip_id,wheelchair_accessible\nR1,T1,1\nR1,T2,0\n",
+            'stop_times.txt': (
+                "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+                "T1,08:05:00,08:06:00,S2,2\n"
+                "T1,08:00:00,08:00:30,S1,1\n"
+                "T2,25:00:00,25:00:00,S3,1\n"
+                "T2,25:00:20,25:00:20,S2,2\n"
+            )
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, content in files.items():
+                (Path(tmp_dir) / name).write_text(content)
+            graph = self.data_loader.load_gtfs_data(tmp_dir)
+        
+        self.assertEqual(graph.number_of_edges(), 2)
+        self.assertFalse(graph.has_edge('Alpha', 'Gamma'))
+        edge_data = graph.get_edge_data('Alpha', 'Beta')
+        self.assertEqual(edge_data['travel_time'], 4.5)
+        self.assertTrue(edge_data['wheelchair_accessible'])
+        
+        # Travel times are at least one minute
+        edge_data = graph.get_edge_data('Gamma', 'Beta')
+        self.assertEqual(edge_data['travel_time'], 1)
+        self.assertFalse(edge_data['wheelchair_accessible'])
+    
+    def test_load_cache(self):
+        """Test parsed files are cached by content and reparsed when they change"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'transit.csv'
+            file_path.write_text("from_stop,to_stop,travel_time\nA,B,2\n")
+            data_loader = DataLoader(cache_dir=Path(tmp_dir) / 'cache')
+            
+            graph = data_loader.load_transit_csv(file_path)
+            self.assertEqual(len(list((Path(tmp_dir) / 'cache').glob('csv-*.pkl'))), 1)
+            cached = data_loader.load_transit_csv(file_path)
+            self.assertEqual(list(cached.edges(data=True)), list(graph.edges(data=True)))
+            self.assertEqual(cached.graph, graph.graph)
+            
+            file_path.write_text("from_stop,to_stop,travel_time\nA,C,4\n")
+            self.assertTrue(data_loader.load_transit_csv(file_path).has_edge('A', 'C'))
+    
+    def test_load_transit_geojson_batches(self):
+        """Test GeoJSON edges are inserted correctly across batch boundaries"""
+        import json
+        import tempfile
+        from unittest import mock
+        features = [
+            {'type': 'Feature', 'properties': {'route_id': f'R{i}', 'travel_time': i + 1},
+             'geometry': {'type': 'LineString', 'coordinates': [[i, 0.0], [i + 1, 0.0]]}}
+            for i in range(5)
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'network.geojson'
+            file_path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+            with mock.patch('data_loader._EDGE_BATCH_SIZE', 2):
+                graph = self.data_loader.load_transit_geojson(file_path)
+            clipped = self.data_loader.load_transit_geojson(file_path, bbox=(0, -1, 2.5, 1))
+        
+        self.assertEqual(graph.number_of_edges(), 5)
+        edge_data = graph.get_edge_data('Stop_4.000000_0.000000', 'Stop_5.000000_0.000000')
+        self.assertEqual(edge_data['route_id'], 'R4')
+        self.assertEqual(edge_data['travel_time'], 5)
+        
+        # Only segments with both endpoints inside the box are kept
+        self.assertEqual(sorted(data['route_id'] for _, _, data in clipped.edges(data=True)), ['R0', 'R1'])
+
+
+class TestAccessibilityFilter(unittest.TestCase):
+    """Test cases for the AccessibilityFilter class"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.accessibility_data = {
+            'A': {'wheelchair_accessible': True, 'has_stairs': True, 'has_ramp': True},
+            'B': {'wheelchair_accessible': True, 'has_elevator': True, 'elevator_working': False},
+            'C': {'has_stairs': False}
+        }
+        self.accessibility_filter = AccessibilityFilter(self.accessibility_data)
+    
+    def test_meets_requirements_masks(self):
+        """Test requirement checks against packed feature masks"""
+        self.assertTrue(self.accessibility_filter.meets_requirements('A', ['wheelchair_accessible', 'no_stairs']))
+        self.assertTrue(self.accessibility_filter.meets_requirements('C', ['no_stairs']))
+        self.assertFalse(self.accessibility_filter.meets_requirements('B', ['working_elevator']))
+        self.assertFalse(self.accessibility_filter.meets_requirements('Unknown', ['no_stairs']))
+        self.assertTrue(self.accessibility_filter.meets_requirements('Unknown', []))
+        self.assertFalse(self.accessibility_filter.meets_requirements('A', ['not_a_requirement']))
+    
+    def test_requirement_order(self):
+        """Test a requirement list compiles to the same masks in any order"""
+        from itertools import permutations
+        requirements = ['wheelchair_accessible', 'no_stairs', 'low_floor_vehicle']
+        compiled = {self.accessibility_filter.compile_requirements(list(order))
+                    for order in permutations(requirements)}
+        self.assertEqual(len(compiled), 1)
+        self.assertFalse(self.accessibility_filter.meets_requirements('A', ['low_floor_vehicle', 'no_stairs']))
+    
+    def test_edge_meets_requirements_masks(self):
+        """Test edge checks combine both stop masks and the edge mask"""
+        edge_data = {'wheelchair_accessible': True, 'low_floor': False}
+        self.assertTrue(self.accessibility_filter.edge_meets_requirements(
+            'A', 'B', edge_data, ['wheelchair_accessible']))
+        self.assertFalse(self.accessibility_filter.edge_meets_requirements(
+            'A', 'C', edge_data, ['wheelchair_accessible']))
+        self.assertFalse(self.accessibility_filter.edge_meets_requirements(
+            'A', 'B', {'wheelchair_accessible': False}, ['wheelchair_accessible']))
+    
+    def test_filter_edges_bulk(self):
+        """Test bulk edge filtering over a packed mask array"""
+        graph = nx.Graph()
+        graph.add_edge('A', 'B', wheelchair_accessible=True, low_floor=True)
+        graph.add_edge('B', 'C', wheelchair_accessible=True)
+        graph.add_edge('C', 'D', wheelchair_accessible=False)
+        edge_masks, edges = DataLoader().edge_mask_array(graph)
+        
+        _, edge_required = self.accessibility_filter.compile_requirements(['wheelchair_accessible'])
+        matches = self.accessibility_filter.filter_edges_bulk(edge_masks, edge_required)
+        self.assertEqual([edge for edge, ok in zip(edges, matches) if ok], [('A', 'B'), ('B', 'C')])
+        
+        _, edge_required = self.accessibility_filter.compile_requirements(['low_floor_vehicle'])
+        matches = self.accessibility_filter.filter_edges_bulk(edge_masks, edge_required)
+        self.assertEqual(matches.tolist(), [True, False, False])
+    
+    def test_filter_stops_by_requirements(self):
+        """Test vectorized stop filtering keeps order and skips unknown stops"""
+        stops = ['C', 'Unknown', 'A', 'B']
+        self.assertEqual(self.accessibility_filter.filter_stops_by_requirements(stops, ['no_stairs']), ['C', 'A', 'B'])
+        self.assertEqual(self.accessibility_filter.filter_stops_by_requirements(stops, []), stops)
+        self.assertEqual(self.accessibility_filter.filter_stops_by_requirements(stops, ['bogus']), [])
+    
+    def test_edges_meet_requirements_bulk(self):
+        """Test bulk edge checks agree with edge_meets_requirements"""
+        edges = [('A', 'B', {'wheelchair_accessible': True}),
+                 ('A', 'C', {'wheelchair_accessible': True}),
+                 ('B', 'Unknown', {'wheelchair_accessible': False})]
+        graph = nx.Graph()
+        graph.add_edges_from(edges)
+        edge_masks, pairs = DataLoader().edge_mask_array(graph)
+        
+        for requirements in [[], ['wheelchair_accessible'], ['no_stairs']]:
+            bulk = self.accessibility_filter.edges_meet_requirements(
+                [u for u, _ in pairs], [v for _, v in pairs], edge_masks, requirements)
+            expected = [self.accessibility_filter.edge_meets_requirements(u, v, graph[u][v], requirements)
+                        for u, v in pairs]
+            self.assertEqual(bulk.tolist(), expected)
+    
+    def test_invalidate(self):
+        """Test in-place updates match a filter rebuilt from the same data"""
+        predicate = self.accessibility_filter.compile_predicate(['working_elevator'])
+        self.accessibility_data['B']['elevator_working'] = True
+        self.accessibility_data['D'] = {'has_elevator': True, 'audio_announcements': True}
+        self.accessibility_filter.invalidate('B')
+        self.accessibility_filter.invalidate('D')
+        rebuilt = AccessibilityFilter(self.accessibility_data)
+        
+        stops = ['A', 'B', 'C', 'D', 'Unknown']
+        self.assertTrue(predicate('B'))
+        self.assertEqual(self.accessibility_filter.stop_mask_array(stops).tolist(),
+                         rebuilt.stop_mask_array(stops).tolist())
+        for stop in stops:
+            self.assertEqual(self.accessibility_filter.get_accessibility_score(stop),
+                             rebuilt.get_accessibility_score(stop))
+    
+    def test_compile_predicate(self):
+        """Test compiled predicates match meets_requirements and are reused"""
+        for requirements in [[], ['no_stairs'], ['wheelchair_accessible', 'no_stairs'], ['bogus']]:
+            predicate = self.accessibility_filter.compile_predicate(requirements)
+            for stop in ['A', 'B', 'C', 'Unknown']:
+                self.assertEqual(predicate(stop), self.accessibility_filter.meets_requirements(stop, requirements))
+        
+        self.assertIs(self.accessibility_filter.compile_predicate(['no_stairs', 'wheelchair_accessible']),
+                      self.accessibility_filter.compile_predicate(['wheelchair_accessible', 'no_stairs']))
+
+
+class TestAccessibleRouter(unittest.TestCase):
+    """Test cases for the AccessibleRouter class"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.graph = nx.Graph()
+        self.graph.add_edge('A', 'B', travel_time=2.0, route_id='R1', wheelchair_accessible=True)
+        self.graph.add_edge('B', 'D', travel_time=2.0, route_id='R1', wheelchair_accessible=True)
+        self.graph.add_edge('A', 'C', travel_time=1.0, route_id='R2', wheelchair_accessible=False)
+        self.graph.add_edge('C', 'D', travel_time=1.0, route_id='R2', wheelchair_accessible=True)
+        self.graph.add_node('E')
+        self.accessibility_data = {stop: {'wheelchair_accessible': True} for stop in 'ABCD'}
+        self.router = AccessibleRouter(self.graph, self.accessibility_data)
+    
+    def test_find_path(self):
+        """Test the fastest path and failure messages of basic routing"""
+        result = self.router.find_path('A', 'D')
+        self.assertEqual(result['path'], ['A', 'C', 'D'])
+        self.assertEqual(result['total_time'], 2.0)
+        self.assertEqual(result['transfers'], 0)
+        
+        self.assertEqual(self.router.find_path('A', 'A')['path'], ['A'])
+        self.assertEqual(self.router.find_path('A', 'E')['message'], "No route found between A and E")
+        self.assertEqual(self.router.find_path('A', 'X')['message'], "Stop not found: Target X is not in G")
+    
+    def test_find_accessible_path(self):
+        """Test accessible routing skips segments failing the requirements"""
+        result = self.router.find_accessible_path('A', 'D', ['wheelchair_accessible'])
+        self.assertEqual(result['path'], ['A', 'B', 'D'])
+        self.assertEqual(result['total_time'], 4.0)
+        
+        self.assertIsNone(self.router.find_accessible_path('A', 'D', ['no_stairs'])['path'])
+        self.assertIsNone(self.router.find_accessible_path('A', 'E', ['wheelchair_accessible'])['path'])
+    
+    def test_frozen_graph(self):
+        """Test filtered routing reads the transit graph without copying or modifying it"""
+        router = AccessibleRouter(nx.freeze(self.graph), self.accessibility_data)
+        self.assertEqual(router.find_accessible_path('A', 'D', ['wheelchair_accessible'])['path'],
+                         ['A', 'B', 'D'])
+        self.assertEqual(self.graph.number_of_edges(), 4)
+        self.assertIs(router._search_graph(None), router._search_graph([]))
+    
+    def test_total_time_matches_details(self):
+        """Test the single search returns a path whose segments add up to its time"""
+        for start in 'ABCD':
+            for end in 'ABCD':
+                for result in [self.router.find_path(start, end),
+                               self.router.find_accessible_path(start, end, ['wheelchair_accessible'])]:
+                    if result['path'] is None:
+                        continue
+                    self.assertEqual((result['path'][0], result['path'][-1]), (start, end))
+                    self.assertEqual(sum(segment['time'] for segment in result['details']),
+                                     result['total_time'])
+    
+    def test_bidirectional_dijkstra(self):
+        """Test the fallback search over stop indices agrees with NetworkX"""
+        self.graph.add_edge('D', 'F')
+        router = AccessibleRouter(self.graph, self.accessibility_data)
+        csr = router._build_csr()
+        adjacency = [
+            [(v, w) for v, w in zip(csr.indices[a:b].tolist(), router._weights[a:b].tolist())]
+            for a, b in zip(csr.indptr[:-1], csr.indptr[1:])
+        ]
+        
+        index = csr.node_index
+        for end in ['A', 'B', 'D', 'F']:
+            total_time, path = router._bidirectional_dijkstra(adjacency, index['A'], index[end])
+            self.assertEqual((total_time, [csr.nodes[i] for i in path]),
+                             nx.single_source_dijkstra(self.graph, 'A', end, weight='travel_time'))
+        
+        with self.assertRaises(nx.NetworkXNoPath):
+            router._bidirectional_dijkstra(adjacency, index['A'], index['E'])
+    
+    def test_update_accessibility(self):
+        """Test updates drop only the cached matrices whose result they change"""
+        for stop_data in self.accessibility_data.values():
+            stop_data['has_stairs'] = False
+        self.router = AccessibleRouter(self.graph, self.accessibility_data)
+        self.router.find_accessible_path('A', 'D', ['wheelchair_accessible'])
+        self.assertEqual(self.router.find_accessible_path('A', 'D', ['no_stairs'])['path'], ['A', 'C', 'D'])
+        
+        self.router.update_accessibility('B', wheelchair_accessible=False)
+        self.assertEqual(set(self.router._search_graphs), {frozenset(['no_stairs'])})
+        self.assertIsNone(self.router.find_accessible_path('A', 'D', ['wheelchair_accessible'])['path'])
+        self.assertEqual(self.router.get_accessibility_info('B'), {'wheelchair_accessible': False, 'has_stairs': False})
+        
+        # Data edited directly is picked up by the next router
+        self.accessibility_data['B']['wheelchair_accessible'] = True
+        router = AccessibleRouter(self.graph, self.accessibility_data)
+        self.assertEqual(router.find_accessible_path('A', 'D', ['wheelchair_accessible'])['path'], ['A', 'B', 'D'])
+    
+    def test_route_cache(self):
+        """Test repeated queries are served from the route cache until an update affects them"""
+        result = self.router.find_path('A', 'D')
+        result['path'].append('X')
+        result['details'][0]['time'] = 9.0
+        self.assertEqual(self.router.find_path('A', 'D'), self.router._find_path('A', 'D'))
+        self.assertEqual(self.router.find_accessible_path('A', 'D', [])['path'], ['A', 'C', 'D'])
+        requirements = ['wheelchair_accessible']
+        self.router.find_accessible_path('B', 'D', requirements)
+        requirements.append('no_stairs')
+        self.assertEqual(self.router.find_accessible_path('B', 'D', ['wheelchair_accessible'])['requirements_met'],
+                         ['wheelchair_accessible'])
+        self.assertEqual(len(self.router._route_cache), 3)
+        
+        self.router.update_accessibility('C', elevator_working=False)
+        self.assertEqual(set(self.router._route_cache),
+                         {('A', 'D', None), ('B', 'D', ('wheelchair_accessible',))})
+        self.router.update_accessibility('E', wheelchair_accessible=True)
+        self.assertEqual(set(self.router._route_cache), {('A', 'D', None)})
+    
+    def test_unrestricted_requirements(self):
+        """Test requirements every stop and segment meets share the unrestricted search graph"""
+        self.graph['A']['C']['wheelchair_accessible'] = True
+        self.accessibility_data['E'] = {'wheelchair_accessible': True}
+        router = AccessibleRouter(self.graph, self.accessibility_data)
+        self.assertEqual(router.find_accessible_path('A', 'D', ['wheelchair_accessible'])['path'], ['A', 'C', 'D'])
+        self.assertIs(router._search_graph(['wheelchair_accessible']), router._search_graph(None))
+        self.assertIsNot(router._search_graph(['no_stairs']), router._search_graph(None))
+        
+        router.update_accessibility('C', wheelchair_accessible=False)
+        self.assertEqual(router.find_accessible_path('A', 'D', ['wheelchair_accessible'])['path'], ['A', 'B', 'D'])
+    
+    def test_all_pairs(self):
+        """Test small graphs switch to all-pairs tables after repeated searches, until an update"""
+        from unittest import mock
+        router = self.router
+        requirements = ['wheelchair_accessible']
+        for end in 'ABCD':
+            router.find_accessible_path('A', end, requirements)
+        self.assertEqual(len(router._all_pairs_tables), 0)
+        compiled = router._jit_search or router._weight_matrix is not None
+        
+        # Once more sources were searched than there are stops, the tables pay off
+        for end in 'AB':
+            router.find_accessible_path('B', end, requirements)
+        self.assertEqual(list(router._all_pairs_tables), [frozenset(requirements)] if compiled else [])
+        self.assertEqual(router.find_accessible_path('C', 'A', requirements)['path'], ['C', 'D', 'B', 'A'])
+        
+        # Updates drop the tables and restart the count
+        router.update_accessibility('B', wheelchair_accessible=False)
+        self.assertEqual(len(router._all_pairs_tables), 0)
+        self.assertIsNone(router.find_accessible_path('A', 'D', requirements)['path'])
+        self.assertEqual(len(router._all_pairs_tables), 0)
+        
+        with mock.patch('routing_engine._ALL_PAIRS_MAX_TABLES', 1):
+            for start in 'ABCDE':
+                router.find_path(start, 'A')
+            router.find_path('A', 'B')
+        self.assertEqual(list(router._all_pairs_tables), [frozenset()] if compiled else [])
+    
+    def test_get_accessible_stops(self):
+        """Test vectorized stop selection follows graph order and updates"""
+        self.assertEqual(self.router.get_accessible_stops([]), ['A', 'B', 'D', 'C', 'E'])
+        self.assertEqual(self.router.get_accessible_stops(['wheelchair_accessible']), ['A', 'B', 'D', 'C'])
+        
+        self.router.update_accessibility('D', wheelchair_accessible=False)
+        self.router.update_accessibility('E', wheelchair_accessible=True)
+        self.assertEqual(self.router.get_accessible_stops(['wheelchair_accessible']), ['A', 'B', 'C', 'E'])
+        self.assertEqual(self.router.get_accessible_stops(['bogus']), [])
+    
+    def test_count_transfers(self):
+        """Test transfers count route changes, skipping segments without a route"""
+        routes = ['R1', 'R1', 'R2', None, 'R2', 'R1']
+        details = [{'route': route} for route in routes]
+        self.assertEqual(self.router._count_transfers(details), 3)
+        self.assertEqual(self.router._count_transfers(details[:2]), 0)
+        self.assertEqual(self.router._count_transfers([]), 0)
+    
+    def test_find_paths_batch(self):
+        """Test batch routing returns what the single-pair methods return"""
+        sources = ['A', 'A', 'B', 'E', 'X']
+        targets = ['D', 'C', 'D', 'A', 'A']
+        for requirements in [None, ['wheelchair_accessible']]:
+            expected = [self.router.find_path(start, end) if requirements is None else
+                        self.router.find_accessible_path(start, end, requirements)
+                        for start, end in zip(sources, targets)]
+            self.assertEqual(self.router.find_paths_batch(sources, targets, requirements), expected)
+    
+    def test_find_paths_batch_ties(self):
+        """Test batch routing breaks ties between equal-time routes like single queries"""
+        from unittest import mock
+        
+        graph = nx.relabel_nodes(nx.grid_2d_graph(4, 4), lambda node: f"{node[0]}-{node[1]}")
+        for u, v, data in graph.edges(data=True):
+            data.update(travel_time=1.0, route_id=f"R{u[0]}" if u[0] == v[0] else f"C{u[-1]}")
+        pairs = [(start, end) for start in graph for end in graph]
+        
+        # Small graphs are searched without Numba unless the threshold is lowered
+        for min_stops in (0, graph.number_of_nodes() + 1):
+            with mock.patch('routing_engine._JIT_MIN_STOPS', min_stops):
+                router = AccessibleRouter(graph, {})
+                batch = router.find_paths_batch([start for start, _ in pairs], [end for _, end in pairs])
+                self.assertEqual(batch, [router.find_path(start, end) for start, end in pairs])
+    
+    def test_find_paths_concurrent(self):
+        """Test threaded queries return what sequential queries return"""
+        queries = [('A', 'D'), ('A', 'D', ['wheelchair_accessible']), ('B', 'C', []), ('A', 'X')] * 5
+        expected = [self.router.find_path(*query) if len(query) == 2 else self.router.find_accessible_path(*query)
+                    for query in queries]
+        
+        router = AccessibleRouter(self.graph, self.accessibility_data)
+        self.assertEqual(router.find_paths_concurrent(queries, max_workers=4), expected)
+    
+    def test_build_route_details(self):
+        """Test segment details read from the CSR edge arrays"""
+        self.graph['B']['D'].update(has_elevator=True, has_stairs=False)
+        self.accessibility_data['B']['elevator_working'] = False
+        router = AccessibleRouter(self.graph, self.accessibility_data)
+        
+        details = router._build_route_details(['A', 'B', 'D'], include_accessibility=True)
+        self.assertEqual(details, [
+            {'from': 'A', 'to': 'B', 'route': 'R1', 'time': 2.0, 'accessibility_notes': "Wheelchair accessible"},
+            {'from': 'B', 'to': 'D', 'route': 'R1', 'time': 2.0,
+             'accessibility_notes': "Wheelchair accessible; No stairs"}
+        ])
+        self.assertEqual(router._build_route_details(['D', 'C'])[0],
+                         {'from': 'D', 'to': 'C', 'route': 'R2', 'time': 1.0})
+        
+        router.update_accessibility('B', elevator_working=True)
+        self.assertEqual(router._build_route_details(['B', 'D'], include_accessibility=True)[0]['accessibility_notes'],
+                         "Wheelchair accessible; Elevator available; No stairs")
+    
+    def test_heap4(self):
+        """Test the 4-ary heap used by compiled searches pops in heapq order"""
+        import heapq
+        import random
+        import numpy as np
+        from _accel import heap4_pop, heap4_push
+        
+        rng = random.Random(7)
+        keys = np.empty(200)
+        values = np.empty(200, dtype=np.int64)
+        size = 0
+        reference = []
+        for value in range(200):
+            key = float(rng.randrange(50))
+            size = heap4_push(keys, values, size, key, value)
+            heapq.heappush(reference, key)
+            if value % 3 == 0:
+                popped, _, size = heap4_pop(keys, values, size)
+                self.assertEqual(popped, heapq.heappop(reference))
+        
+        while size:
+            popped, _, size = heap4_pop(keys, values, size)
+            self.assertEqual(popped, heapq.heappop(reference))
+        self.assertEqual(reference, [])
+    
+    def test_dijkstra_csr(self):
+        """Test the CSR Dijkstra kernel agrees with NetworkX and stops at the destination"""
+        import numpy as np
+        from _accel import dijkstra_csr
+        
+        self.graph.add_edge('D', 'F', travel_time=5.0)
+        csr = AccessibleRouter(self.graph, self.accessibility_data)._build_csr()
+        index = csr.node_index
+        for end in ['A', 'B', 'D', 'F']:
+            dist, predecessors = dijkstra_csr(csr.indptr, csr.indices, csr.travel_time, index['A'], index[end])
+            path = [index[end]]
+            while path[-1] != index['A']:
+                path.append(predecessors[path[-1]])
+            self.assertEqual((dist[index[end]], [csr.nodes[i] for i in reversed(path)]),
+                             nx.single_source_dijkstra(self.graph, 'A', end, weight='travel_time'))
+        
+        dist, _ = dijkstra_csr(csr.indptr, csr.indices, csr.travel_time, index['A'], index['C'])
+        self.assertTrue(np.isinf(dist[index['F']]))
+        dist, _ = dijkstra_csr(csr.indptr, csr.indices, csr.travel_time, index['A'], index['E'])
+        self.assertEqual(dist[index['F']], 7.0)
+        self.assertTrue(np.isinf(dist[index['E']]))